@@ -0,0 +1,134 @@
+import argparse
+import json
+import sys
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable
+
+import inject
+
+import paf.config
+from paf.control import change
+from paf.manager import WebDriverManager
+from paf.page import FinderPage
+from paf.request import WebDriverRequest
+
+from benchmark.scenarios import SCENARIOS, Scenario, create_document
+from benchmark.server import FakeWebDriverServer
+
+
+@dataclass
+class Result:
+    name: str
+    iterations: int
+    ops_per_second: float
+    ms_per_op: float
+    commands_per_op: float
+
+    def __str__(self):
+        return f"{self.name:<36} {self.ops_per_second:>10.1f} ops/s {self.ms_per_op:>9.3f} ms/op {self.commands_per_op:>7.2f} cmd/op"
+
+
+def run_scenario(
+        server: FakeWebDriverServer,
+        page: FinderPage,
+        scenario: Scenario,
+        duration: float = 1,
+        min_iterations: int = 5,
+) -> Result:
+    with change(**scenario.config):
+        operation = scenario.setup(page)
+        # Warms up the caches
+        operation()
+
+        iterations = 0
+        commands = server.command_count
+        start = perf_counter()
+        elapsed = 0
+        while iterations < min_iterations or elapsed < duration:
+            operation()
+            iterations += 1
+            elapsed = perf_counter() - start
+        commands = server.command_count - commands
+
+    return Result(
+        name=scenario.name,
+        iterations=iterations,
+        ops_per_second=iterations / elapsed,
+        ms_per_op=elapsed * 1000 / iterations,
+        commands_per_op=commands / iterations,
+    )
+
+
+def run(
+        scenarios: Iterable[Scenario] = SCENARIOS,
+        latency: float = 0,
+        duration: float = 1,
+        min_iterations: int = 5,
+) -> list[Result]:
+    if not inject.is_configured():
+        inject.configure(paf.config.inject)
+
+    manager = inject.instance(WebDriverManager)
+    with FakeWebDriverServer(create_document, latency=latency) as server:
+        request = WebDriverRequest("benchmark")
+        request.browser = "chrome"
+        request.server_url = server.url
+        webdriver = manager.get_webdriver(request)
+        try:
+            page = FinderPage(webdriver)
+            # The fake server doesn't evaluate scripts
+            with change(script_resolution=False):
+                return [run_scenario(server, page, scenario, duration, min_iterations) for scenario in scenarios]
+        finally:
+            manager.shutdown(webdriver)
+
+
+def compare(results: list[Result], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """
+    Returns the regressions against the baseline.
+    The amount of commands is deterministic and must not increase, the throughput may vary within the tolerance.
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.name)
+        if expected is None:
+            continue
+        if result.commands_per_op > expected["commands_per_op"] + 0.01:
+            regressions.append(f"{result.name}: {result.commands_per_op:.2f} commands/op, was {expected['commands_per_op']:.2f}")
+        if result.ops_per_second < expected["ops_per_second"] * (1 - tolerance):
+            regressions.append(f"{result.name}: {result.ops_per_second:.1f} ops/s, was {expected['ops_per_second']:.1f}")
+    return regressions
+
+
+def main(args: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Benchmarks paf against a fake WebDriver server")
+    parser.add_argument("--latency", type=float, default=0, help="Simulated latency per command in milliseconds")
+    parser.add_argument("--duration", type=float, default=1, help="Minimum duration per scenario in seconds")
+    parser.add_argument("--min-iterations", type=int, default=5, help="Minimum iterations per scenario")
+    parser.add_argument("--scenario", action="append", help="Runs only scenarios containing the given name")
+    parser.add_argument("--json", type=Path, help="Writes the results to the given file")
+    parser.add_argument("--baseline", type=Path, help="Compares the results with a previously written file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput loss against the baseline")
+    options = parser.parse_args(args)
+
+    scenarios = [
+        scenario for scenario in SCENARIOS
+        if not options.scenario or any(name in scenario.name for name in options.scenario)
+    ]
+    results = run(scenarios, options.latency / 1000, options.duration, options.min_iterations)
+    for result in results:
+        print(result)
+
+    if options.json:
+        options.json.write_text(json.dumps({result.name: asdict(result) for result in results}, indent=2))
+
+    if options.baseline:
+        regressions = compare(results, json.loads(options.baseline.read_text()), options.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+from paf.cache import invalidate
+from paf.control import change
+from paf.locator import By
+from paf.page import FinderPage
+from paf.uielement import UiElement
+
+from benchmark.server import Node
+
+CHAIN_DEPTH = 6
+LIST_SIZE = 50
+
+
+def create_document() -> Node:
+    chain = Node("span", {"class": "leaf"}, text="leaf")
+    for level in reversed(range(CHAIN_DEPTH)):
+        chain = Node("div", {"class": f"level{level}"}, [chain, Node("div", {"class": "sibling"}), Node("div", {"class": "sibling"})])
+
+    items = [
+        Node("li", {"class": "item", "data-index": str(i)}, text=f"Item {i}", displayed=i % 5 != 0)
+        for i in range(LIST_SIZE)
+    ]
+
+    shadow_root = Node("#shadow-root", children=[
+        Node("div", {"class": "inner"}, [Node("span", {"class": "leaf"}, text="shadow leaf")])
+    ])
+
+    frame_document = Node("html", children=[
+        Node("div", {"id": "framed"}, [Node("button", {"class": "action"}, text="framed")])
+    ])
+
+    return Node("html", children=[
+        Node("body", children=[
+            Node("section", {"id": "chain"}, [chain]),
+            Node("ul", {"id": "list"}, items),
+            Node("div", {"id": "host"}, shadow_root=shadow_root),
+            Node("iframe", {"id": "frame"}, content_document=frame_document),
+            Node("form", {"id": "form"}, [
+                Node("input", {"id": "input", "name": "input"}),
+                Node("textarea", {"id": "textarea"}),
+                Node("input", {"id": "file", "type": "file"}),
+                Node("button", {"id": "button"}, text="Submit"),
+            ]),
+        ])
+    ])
+
+
+def _deep_chain(page: FinderPage) -> UiElement:
+    ui_element = page.find(By.id("chain"))
+    for level in range(CHAIN_DEPTH):
+        ui_element = ui_element.find(f".level{level}")
+    return ui_element.find(".leaf")
+
+
+def _lookup(ui_element: UiElement, cold: bool = False) -> Callable[[], None]:
+    def _run():
+        if cold:
+            invalidate(ui_element.webdriver)
+        with ui_element.find_web_element():
+            pass
+    return _run
+
+
+def lookup_deep_chain(page: FinderPage):
+    return _lookup(_deep_chain(page))
+
+
+def lookup_deep_chain_cold(page: FinderPage):
+    return _lookup(_deep_chain(page), cold=True)
+
+
+def lookup_shadow_root(page: FinderPage):
+    return _lookup(page.find("#host").find(".inner").find(".leaf"), cold=True)
+
+
+def lookup_iframe(page: FinderPage):
+    return _lookup(page.find("#frame").find("#framed").find(".action"), cold=True)
+
+
+def list_iteration(page: FinderPage):
+    items = page.find("#list").find(".item")
+
+    def _run():
+        for item in items:
+            item.expect.text.actual
+    return _run
+
+
+def action_click(page: FinderPage):
+    return _deep_chain(page).click
+
+
+def action_send_keys(page: FinderPage):
+    # type() verifies the value by a script, which the fake server doesn't evaluate
+    return lambda: page.find("#input").send_keys("Hello World")
+
+
+def assertion_passing(page: FinderPage):
+    ui_element = _deep_chain(page)
+    return lambda: ui_element.expect.text.be("leaf")
+
+
+def assertion_failing(page: FinderPage):
+    ui_element = _deep_chain(page)
+
+    def _run():
+        with change(retry_count=3, wait_after_fail=0):
+            try:
+                ui_element.expect.text.be("other")
+            except AssertionError:
+                pass
+    return _run
+
+
+@dataclass
+class Scenario:
+    name: str
+    setup: Callable[[FinderPage], Callable[[], None]]
+    config: dict = field(default_factory=dict)
+
+
+SCENARIOS = [
+    Scenario("lookup_deep_chain", lookup_deep_chain),
+    Scenario("lookup_deep_chain_cold", lookup_deep_chain_cold),
+    Scenario("lookup_deep_chain_no_cache", lookup_deep_chain, {"element_cache": False}),
+    Scenario("lookup_shadow_root", lookup_shadow_root),
+    Scenario("lookup_iframe", lookup_iframe),
+    Scenario("list_iteration", list_iteration),
+    Scenario("action_click", action_click),
+    Scenario("action_send_keys", action_send_keys),
+    Scenario("assertion_passing", assertion_passing),
+    Scenario("assertion_failing", assertion_failing),
+]
@@ -0,0 +1,356 @@
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Iterator
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+SHADOW_KEY = "shadow-6066-11e4-a52e-4f735466cecf"
+
+_ids = itertools.count()
+
+
+class WebDriverError(Exception):
+    def __init__(self, error: str, message: str, status: int = 404):
+        super().__init__(message)
+        self.error = error
+        self.status = status
+
+
+class Node:
+    def __init__(
+            self,
+            tag: str,
+            attributes: dict = None,
+            children: list["Node"] = (),
+            text: str = "",
+            shadow_root: "Node" = None,
+            content_document: "Node" = None,
+            displayed: bool = True,
+    ):
+        self.id = f"node-{next(_ids)}"
+        self.tag = tag
+        self.attributes = dict(attributes or {})
+        self.children = list(children)
+        self.own_text = text
+        self.shadow_root = shadow_root
+        self.content_document = content_document
+        self.displayed = displayed
+
+    @property
+    def text(self) -> str:
+        texts = [self.own_text] + [child.text for child in self.children if child.displayed]
+        return " ".join(text for text in texts if text)
+
+    def descendants(self) -> Iterator["Node"]:
+        # Shadow roots and frame documents are separate trees
+        for child in self.children:
+            yield child
+            yield from child.descendants()
+
+
+_SELECTOR = re.compile(r'(?P<tag>^[\w-]+|\*)|#(?P<id>[\w-]+)|\.(?P<class>[\w-]+)|\[(?P<attr>[\w-]+)(?:="(?P<value>[^"]*)")?]')
+
+
+def _parse_selector(selector: str) -> list[tuple[str, str, str | None]]:
+    parts = []
+    position = 0
+    selector = selector.strip()
+    while position < len(selector):
+        match = _SELECTOR.match(selector, position)
+        if match is None or match.end() == position:
+            raise WebDriverError("invalid selector", f"Unsupported selector: {selector}", 400)
+        for kind in ("tag", "id", "class", "attr"):
+            if match.group(kind) is not None:
+                parts.append((kind, match.group(kind), match.group("value")))
+        position = match.end()
+    return parts
+
+
+def _matches(node: Node, parts: list[tuple[str, str, str | None]]) -> bool:
+    for kind, name, value in parts:
+        if kind == "tag":
+            if name != "*" and node.tag != name:
+                return False
+        elif kind == "id":
+            if node.attributes.get("id") != name:
+                return False
+        elif kind == "class":
+            if name not in node.attributes.get("class", "").split():
+                return False
+        elif kind == "attr":
+            if name not in node.attributes or (value is not None and node.attributes[name] != value):
+                return False
+    return True
+
+
+def select(context: Node, selector: str) -> list[Node]:
+    parts = _parse_selector(selector)
+    return [node for node in context.descendants() if _matches(node, parts)]
+
+
+def _locator_selector(using: str, value: str) -> str | None:
+    if using in ("css selector", "tag name"):
+        return value
+    if using == "id":
+        return f'[id="{value}"]'
+    if using == "name":
+        return f'[name="{value}"]'
+    if using == "class name":
+        return f".{value}"
+    return None
+
+
+class Session:
+    def __init__(self, document: Node):
+        self.id = f"session-{next(_ids)}"
+        self.document = document
+        self.frames: list[Node] = []
+        self.nodes: dict[str, Node] = {}
+        self.url = "about:blank"
+        self.window_rect = {"x": 0, "y": 0, "width": 1920, "height": 1080}
+
+    @property
+    def current_document(self) -> Node:
+        return self.frames[-1].content_document if self.frames else self.document
+
+    def register(self, node: Node) -> Node:
+        self.nodes[node.id] = node
+        if node.shadow_root is not None:
+            self.nodes[node.shadow_root.id] = node.shadow_root
+        return node
+
+    def node(self, node_id: str) -> Node:
+        node = self.nodes.get(node_id)
+        if node is None:
+            raise WebDriverError("no such element", f"Unknown element: {node_id}")
+        return node
+
+    def find(self, context: Node, using: str, value: str) -> list[Node]:
+        selector = _locator_selector(using, value)
+        if selector is None:
+            raise WebDriverError("invalid selector", f"Unsupported locator strategy: {using}", 400)
+        return [self.register(node) for node in select(context, selector)]
+
+    def encode(self, value: any) -> any:
+        if isinstance(value, Node):
+            self.register(value)
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.encode(item) for key, item in value.items()}
+        return value
+
+    def decode(self, value: any) -> any:
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return self.node(value[ELEMENT_KEY])
+            if SHADOW_KEY in value:
+                return self.node(value[SHADOW_KEY])
+            return {key: self.decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        return value
+
+
+# A transparent PNG of one pixel
+_SCREENSHOT = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+
+
+class _Route:
+    def __init__(self, method: str, pattern: str, handler: Callable):
+        self.method = method
+        self.pattern = re.compile("^" + re.sub(r"\{(\w+)}", r"(?P<\1>[^/]+)", pattern) + "$")
+        self.handler = handler
+
+
+class FakeWebDriverServer:
+    """
+    A W3C WebDriver endpoint with a simulated DOM and latency, for benchmarking without a browser.
+    Scripts are not evaluated, so paf runs against it with ``script_resolution`` disabled.
+    """
+
+    def __init__(self, document_factory: Callable[[], Node], latency: float = 0, host: str = "127.0.0.1", port: int = 0):
+        self.document_factory = document_factory
+        self.latency = latency
+        self.sessions: dict[str, Session] = {}
+        self.command_count = 0
+        self._lock = threading.Lock()
+        self._routes = self.__create_routes()
+        self._server = ThreadingHTTPServer((host, port), self.__create_handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeWebDriverServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-webdriver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __create_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Prevents delayed ACKs from adding latency to kept-alive connections
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def __handle(self, method: str):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                status, value = server.handle(method, self.path, body)
+                data = json.dumps({"value": value}).encode("utf8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self.__handle("GET")
+
+            def do_POST(self):
+                self.__handle("POST")
+
+            def do_DELETE(self):
+                self.__handle("DELETE")
+
+        return Handler
+
+    def handle(self, method: str, path: str, body: dict) -> tuple[int, any]:
+        with self._lock:
+            self.command_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        for route in self._routes:
+            if route.method != method:
+                continue
+            match = route.pattern.match(path)
+            if match is None:
+                continue
+            try:
+                params = match.groupdict()
+                session_id = params.pop("session", None)
+                if session_id is None:
+                    return 200, route.handler(body, **params)
+                session = self.sessions.get(session_id)
+                if session is None:
+                    raise WebDriverError("invalid session id", f"Unknown session: {session_id}")
+                return 200, route.handler(session, body, **params)
+            except WebDriverError as e:
+                return e.status, {"error": e.error, "message": str(e), "stacktrace": ""}
+
+        return 404, {"error": "unknown command", "message": f"{method} {path}", "stacktrace": ""}
+
+    def __new_session(self, body: dict):
+        session = Session(self.document_factory())
+        self.sessions[session.id] = session
+        capabilities = body.get("capabilities", {}).get("alwaysMatch", {})
+        return {"sessionId": session.id, "capabilities": {"browserName": capabilities.get("browserName", "chrome")}}
+
+    def __delete_session(self, session: Session, body: dict):
+        self.sessions.pop(session.id, None)
+
+    def __find(self, session: Session, context: Node, body: dict, single: bool):
+        nodes = session.find(context, body["using"], body["value"])
+        if single:
+            if not nodes:
+                raise WebDriverError("no such element", f"Unable to locate {body['value']}")
+            return session.encode(nodes[0])
+        return session.encode(nodes)
+
+    def __switch_to_frame(self, session: Session, body: dict):
+        frame = body.get("id")
+        if frame is None:
+            session.frames.clear()
+            return None
+        node = session.decode(frame)
+        if not isinstance(node, Node) or node.content_document is None:
+            raise WebDriverError("no such frame", "Element is not a frame")
+        session.frames.append(node)
+        return None
+
+    def __shadow_root(self, session: Session, body: dict, element: str):
+        node = session.node(element)
+        if node.shadow_root is None:
+            raise WebDriverError("no such shadow root", "Element has no shadow root")
+        return {SHADOW_KEY: node.shadow_root.id}
+
+    def __send_keys(self, session: Session, body: dict, element: str):
+        node = session.node(element)
+        node.attributes["value"] = node.attributes.get("value", "") + body.get("text", "")
+
+    def __clear(self, session: Session, body: dict, element: str):
+        session.node(element).attributes["value"] = ""
+
+    def __execute(self, session: Session, body: dict):
+        # Scripts are not evaluated, they are covered by the browser tests
+        session.decode(body.get("args", []))
+        return None
+
+    def __set_window_rect(self, session: Session, body: dict):
+        session.window_rect.update({key: value for key, value in body.items() if value is not None})
+        return session.window_rect
+
+    def __create_routes(self) -> list[_Route]:
+        element = "/session/{session}/element/{element}"
+        return [
+            _Route("POST", "/session", self.__new_session),
+            _Route("DELETE", "/session/{session}", self.__delete_session),
+            _Route("POST", "/session/{session}/url", lambda s, b: setattr(s, "url", b["url"])),
+            _Route("GET", "/session/{session}/url", lambda s, b: s.url),
+            _Route("GET", "/session/{session}/title", lambda s, b: "Benchmark"),
+            _Route("POST", "/session/{session}/element", lambda s, b: self.__find(s, s.current_document, b, True)),
+            _Route("POST", "/session/{session}/elements", lambda s, b: self.__find(s, s.current_document, b, False)),
+            _Route("POST", element + "/element", lambda s, b, element: self.__find(s, s.node(element), b, True)),
+            _Route("POST", element + "/elements", lambda s, b, element: self.__find(s, s.node(element), b, False)),
+            _Route("POST", "/session/{session}/shadow/{shadow}/element", lambda s, b, shadow: self.__find(s, s.node(shadow), b, True)),
+            _Route("POST", "/session/{session}/shadow/{shadow}/elements", lambda s, b, shadow: self.__find(s, s.node(shadow), b, False)),
+            _Route("GET", element + "/shadow", self.__shadow_root),
+            _Route("POST", "/session/{session}/frame", self.__switch_to_frame),
+            _Route("POST", "/session/{session}/frame/parent", lambda s, b: s.frames.pop() if s.frames else None),
+            _Route("GET", element + "/text", lambda s, b, element: s.node(element).text),
+            _Route("GET", element + "/name", lambda s, b, element: s.node(element).tag),
+            _Route("GET", element + "/attribute/{name}", lambda s, b, element, name: s.node(element).attributes.get(name)),
+            _Route("GET", element + "/property/{name}", lambda s, b, element, name: s.node(element).attributes.get(name)),
+            _Route("GET", element + "/css/{name}", lambda s, b, element, name: ""),
+            _Route("GET", element + "/enabled", lambda s, b, element: "disabled" not in s.node(element).attributes),
+            _Route("GET", element + "/selected", lambda s, b, element: "checked" in s.node(element).attributes),
+            _Route("GET", element + "/displayed", lambda s, b, element: s.node(element).displayed),
+            _Route("GET", element + "/rect", lambda s, b, element: {"x": 0, "y": 0, "width": 100, "height": 20}),
+            _Route("POST", element + "/click", lambda s, b, element: s.node(element) and None),
+            _Route("POST", element + "/clear", self.__clear),
+            _Route("POST", element + "/value", self.__send_keys),
+            _Route("POST", "/session/{session}/execute/sync", self.__execute),
+            _Route("POST", "/session/{session}/execute/async", self.__execute),
+            _Route("POST", "/session/{session}/actions", lambda s, b: None),
+            _Route("DELETE", "/session/{session}/actions", lambda s, b: None),
+            _Route("GET", "/session/{session}/window/rect", lambda s, b: s.window_rect),
+            _Route("POST", "/session/{session}/window/rect", self.__set_window_rect),
+            _Route("POST", "/session/{session}/window/maximize", lambda s, b: s.window_rect),
+            _Route("GET", "/session/{session}/window/handles", lambda s, b: ["window"]),
+            _Route("POST", "/session/{session}/window", lambda s, b: None),
+            _Route("GET", "/session/{session}/screenshot", lambda s, b: _SCREENSHOT),
+            _Route("DELETE", "/session/{session}/cookie", lambda s, b: None),
+        ]
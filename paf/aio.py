@@ -0,0 +1,294 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, TypeVar, Iterable, List, AsyncIterator
+
+import inject
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.color import Color
+
+from paf.assertion import AbstractAssertion, defer_tests
+from paf.common import Locator, Property, RetryException
+from paf.control import async_retry, copy_config, use_config
+from paf.dom import Attribute
+from paf.manager import WebDriverManager
+from paf.page import BasePage, PageAssertion
+from paf.uielement import UiElement, UiElementAssertion
+
+RESULT = TypeVar("RESULT")
+
+__executor: ThreadPoolExecutor | None = None
+__lock = threading.Lock()
+__session_locks: weakref.WeakKeyDictionary[WebDriver, tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = weakref.WeakKeyDictionary()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    # All sessions share a bounded number of workers
+    global __executor
+    with __lock:
+        if __executor is None:
+            __executor = ThreadPoolExecutor(
+                max_workers=int(Property.env(Property.PAF_ASYNC_MAX_WORKERS)),
+                thread_name_prefix="paf-aio",
+            )
+            inject.instance(WebDriverManager).add_shutdown_callback(_release_session)
+        return __executor
+
+
+def shutdown_executor():
+    global __executor
+    with __lock:
+        executor = __executor
+        __executor = None
+        __session_locks.clear()
+    if executor is not None:
+        inject.instance(WebDriverManager).remove_shutdown_callback(_release_session)
+        executor.shutdown(wait=False)
+
+
+def _release_session(webdriver: WebDriver):
+    with __lock:
+        __session_locks.pop(webdriver, None)
+    # The workers are not required anymore, when all sessions are closed
+    if len(inject.instance(WebDriverManager).webdrivers) == 0:
+        shutdown_executor()
+
+
+def _get_session_lock(webdriver: WebDriver) -> asyncio.Lock:
+    # Locks are bound to their event loop
+    loop = asyncio.get_running_loop()
+    with __lock:
+        entry = __session_locks.get(webdriver)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.Lock())
+            __session_locks[webdriver] = entry
+        return entry[1]
+
+
+async def run_in_session(webdriver: WebDriver, function: Callable[..., RESULT], *args, **kwargs) -> RESULT:
+    # The workers run with the configuration of the awaiting coroutine
+    config = copy_config()
+
+    def _run():
+        with use_config(config):
+            return function(*args, **kwargs)
+
+    # WebDriver sessions are not thread-safe, so the commands of a session run one after another
+    async with _get_session_lock(webdriver):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), _run)
+
+
+async def _test(webdriver: WebDriver, build: Callable[[], bool]) -> bool:
+    # The sequence waits between the attempts on the event loop, instead of blocking a worker
+    with defer_tests() as sequences:
+        build()
+    sequence = sequences[0]
+    try:
+        await async_retry(lambda: run_in_session(webdriver, sequence.attempt), sequence=sequence.sequence)
+    except RetryException as exception:
+        return await run_in_session(webdriver, sequence.failed, exception)
+    return await run_in_session(webdriver, sequence.passed)
+
+
+def _wrap(value: any, webdriver: WebDriver):
+    if isinstance(value, AbstractAssertion):
+        return AsyncAssertion(value, webdriver)
+    return value
+
+
+class _AsyncAssertionBuilder:
+    def __init__(self, builder: any, webdriver: WebDriver):
+        self._builder = builder
+        self._webdriver = webdriver
+
+    def __getattr__(self, name: str):
+        # Building assertions doesn't perform any WebDriver commands
+        attribute = getattr(self._builder, name)
+        if callable(attribute):
+            def _build(*args, **kwargs):
+                return _wrap(attribute(*args, **kwargs), self._webdriver)
+            return _build
+        return _wrap(attribute, self._webdriver)
+
+
+class AsyncAssertion(_AsyncAssertionBuilder):
+    def __init__(self, assertion: AbstractAssertion, webdriver: WebDriver):
+        super().__init__(assertion, webdriver)
+
+    @property
+    def assertion(self) -> AbstractAssertion:
+        return self._builder
+
+    async def be(self, expected: any) -> bool:
+        return await _test(self._webdriver, lambda: self._builder.be(expected))
+
+    async def not_be(self, expected: any) -> bool:
+        return await _test(self._webdriver, lambda: self._builder.not_be(expected))
+
+    @property
+    def actual(self):
+        return run_in_session(self._webdriver, lambda: self._builder.actual)
+
+
+class AsyncUiElementAssertion(_AsyncAssertionBuilder):
+    def __init__(self, assertion: UiElementAssertion, webdriver: WebDriver):
+        super().__init__(assertion, webdriver)
+
+    async def displayed(self, expected: bool) -> bool:
+        return await _test(self._webdriver, lambda: self._builder.displayed(expected))
+
+    async def enabled(self, expected: bool) -> bool:
+        return await _test(self._webdriver, lambda: self._builder.enabled(expected))
+
+    async def selected(self, expected: bool) -> bool:
+        return await _test(self._webdriver, lambda: self._builder.selected(expected))
+
+    async def visible(self, expected: bool) -> bool:
+        return await _test(self._webdriver, lambda: self._builder.visible(expected))
+
+    async def fully_visible(self, expected: bool) -> bool:
+        return await _test(self._webdriver, lambda: self._builder.fully_visible(expected))
+
+
+class AsyncPageAssertion(_AsyncAssertionBuilder):
+    def __init__(self, assertion: PageAssertion, webdriver: WebDriver):
+        super().__init__(assertion, webdriver)
+
+
+class AsyncUiElement:
+    def __init__(self, ui_element: UiElement):
+        self._ui_element = ui_element
+
+    @property
+    def ui_element(self) -> UiElement:
+        return self._ui_element
+
+    @property
+    def webdriver(self) -> WebDriver:
+        return self._ui_element.webdriver
+
+    @property
+    def name(self):
+        return self._ui_element.name
+
+    def __str__(self):
+        return self._ui_element.__str__()
+
+    async def _run(self, function: Callable[..., RESULT], *args) -> RESULT:
+        return await run_in_session(self.webdriver, function, *args)
+
+    def find(self, by: Locator, name: str = None) -> "AsyncUiElement":
+        return AsyncUiElement(self._ui_element.find(by, name))
+
+    def __getitem__(self, index: int) -> "AsyncUiElement":
+        return AsyncUiElement(self._ui_element[index])
+
+    @property
+    def first(self) -> "AsyncUiElement":
+        return self[0]
+
+    @property
+    def last(self) -> "AsyncUiElement":
+        return self[-1]
+
+    async def __aiter__(self) -> AsyncIterator["AsyncUiElement"]:
+        ui_elements = await self._run(lambda: list(self._ui_element))
+        for ui_element in ui_elements:
+            yield AsyncUiElement(ui_element)
+
+    @property
+    def expect(self):
+        return AsyncUiElementAssertion(self._ui_element.expect, self.webdriver)
+
+    @property
+    def wait_for(self):
+        return AsyncUiElementAssertion(self._ui_element.wait_for, self.webdriver)
+
+    async def collect(self, text: bool = False, attributes: Iterable[str | Attribute] = ()) -> List[dict]:
+        return await self._run(self._ui_element.collect, text, attributes)
+
+    async def click(self):
+        await self._run(self._ui_element.click)
+
+    async def hover(self):
+        await self._run(self._ui_element.hover)
+
+    async def context_click(self):
+        await self._run(self._ui_element.context_click)
+
+    async def long_click(self):
+        await self._run(self._ui_element.long_click)
+
+    async def double_click(self):
+        await self._run(self._ui_element.double_click)
+
+    async def drag_and_drop_to(self, target_ui_element: "AsyncUiElement | UiElement"):
+        if isinstance(target_ui_element, AsyncUiElement):
+            target_ui_element = target_ui_element.ui_element
+        await self._run(self._ui_element.drag_and_drop_to, target_ui_element)
+
+    async def send_keys(self, value: str):
+        await self._run(self._ui_element.send_keys, value)
+
+    async def type(self, value: str):
+        await self._run(self._ui_element.type, value)
+
+    async def clear(self):
+        await self._run(self._ui_element.clear)
+
+    async def submit(self):
+        await self._run(self._ui_element.submit)
+
+    async def scroll_into_view(self, x: int = 0, y: int = 0):
+        await self._run(self._ui_element.scroll_into_view, x, y)
+
+    async def scroll_to_top(self, x: int = 0, y: int = 0):
+        await self._run(self._ui_element.scroll_to_top, x, y)
+
+    async def highlight(self, color: Color = Color.from_string("#0f0"), seconds: float = 2):
+        await self._run(self._ui_element.highlight, color, seconds)
+
+    async def take_screenshot(self, file_name: str = None) -> Path | None:
+        future = await self._run(self._ui_element.capture_screenshot, file_name)
+        return await asyncio.wrap_future(future)
+
+
+class AsyncPage:
+    def __init__(self, page: BasePage):
+        self._page = page
+
+    @property
+    def page(self) -> BasePage:
+        return self._page
+
+    @property
+    def webdriver(self) -> WebDriver:
+        return self._page.webdriver
+
+    @property
+    def name(self):
+        return self._page.name
+
+    def __str__(self):
+        return self._page.__str__()
+
+    async def open(self, url: str):
+        await self.run(self._page.open, url)
+        return self
+
+    async def run(self, function: Callable[..., RESULT], *args, **kwargs) -> RESULT:
+        return await run_in_session(self.webdriver, function, *args, **kwargs)
+
+    def find(self, by: Locator, name: str = None) -> AsyncUiElement:
+        return AsyncUiElement(self._page._find(by, name))
+
+    @property
+    def expect(self):
+        return AsyncPageAssertion(self._page.expect, self.webdriver)
+
+    @property
+    def wait_for(self):
+        return AsyncPageAssertion(self._page.wait_for, self.webdriver)
@@ -1,12 +1,19 @@
+import atexit
+import itertools
 import logging
 import re
+import threading
+import time
+import weakref
 from abc import ABC
-from typing import Generic, TypeVar
+from contextlib import contextmanager
+from typing import Generic, TypeVar, Iterator
 
 import inject
 
-from paf.common import Rect, HasParent, HasName
-from paf.control import RetryException, retry
+from paf.cache import invalidate
+from paf.common import Rect, HasParent, HasName, ElementSnapshot
+from paf.control import RetryException, retry, get_config, create_sequence
 from paf.types import Supplier, Predicate, Number, ACTUAL_TYPE, Mapper
 
 
@@ -23,13 +30,206 @@ class AssertionErrorWrapper(RetryException, AssertionError):
     pass
 
 
+class ObservedSupplier(Generic[ACTUAL_TYPE]):
+    """
+    Records the last supplied value, so that assertions can be named without supplying the value again.
+    """
+    def __init__(self, supplier: Supplier[ACTUAL_TYPE]):
+        self._supplier = supplier
+        self.value: ACTUAL_TYPE | None = None
+
+    def __call__(self) -> ACTUAL_TYPE:
+        # A failing supplier must not leave the previous value behind
+        self.value = None
+        self.value = self._supplier()
+        return self.value
+
+
+class UnusedAssertionRegistry:
+    """
+    Tracks created assertions by weak references until they are used, instead of checking them on finalization.
+    The names of unused assertions are only built when they are flushed.
+    """
+    def __init__(self, max_size: int = 1000):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._alive: dict[int, tuple[int, weakref.finalize]] = {}
+        # Unused assertions, which have been garbage collected
+        self._collected: list[tuple[int, HasName | None, Supplier[str]]] = []
+
+    def register(self, assertion: "AbstractAssertion"):
+        key = id(assertion)
+        sequence = next(self._sequence)
+        # The finalizer must not reference the assertion, only what is required for its name
+        finalizer = weakref.finalize(assertion, self.__collect, key, sequence, assertion._parent, assertion._name_supplier)
+        finalizer.atexit = False
+        with self._lock:
+            self._alive[key] = (sequence, finalizer)
+
+        # Prevents unflushed registries from growing infinitely, but only reports assertions which cannot be used anymore
+        if len(self._collected) > self._max_size:
+            self.__report(self.__take_collected())
+
+    def unregister(self, assertion: "AbstractAssertion"):
+        with self._lock:
+            entry = self._alive.pop(id(assertion), None)
+        if entry:
+            entry[1].detach()
+
+    def __collect(self, key: int, sequence: int, parent: HasName | None, name_supplier: Supplier[str]):
+        # Called by the garbage collector, appending is atomic and doesn't need the lock
+        self._alive.pop(key, None)
+        self._collected.append((sequence, parent, name_supplier))
+
+    def __take_collected(self) -> list[tuple[int, Supplier[str]]]:
+        collected, self._collected = self._collected, []
+
+        def _name_supplier(parent: HasName | None, name_supplier: Supplier[str]):
+            if isinstance(parent, HasParent):
+                return lambda: parent.name_path + name_supplier()
+            elif parent is not None:
+                return lambda: parent.name + name_supplier()
+            return name_supplier
+
+        return [(sequence, _name_supplier(parent, name_supplier)) for sequence, parent, name_supplier in collected]
+
+    def __report(self, unused: list[tuple[int, Supplier[str]]]) -> list[str]:
+        names = [name_supplier() for sequence, name_supplier in sorted(unused, key=lambda entry: entry[0])]
+        for name in names:
+            logging.warning(f"Unused Assertion: {name}")
+        return names
+
+    def flush(self) -> list[str]:
+        with self._lock:
+            alive = list(self._alive.values())
+            self._alive.clear()
+
+        unused = self.__take_collected()
+        for sequence, finalizer in alive:
+            info = finalizer.detach()
+            if info is not None:
+                assertion = info[0]
+                unused.append((sequence, lambda assertion=assertion: assertion.name_path))
+        return self.__report(unused)
+
+
+unused_assertions = UnusedAssertionRegistry()
+atexit.register(unused_assertions.flush)
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def defer_tests() -> Iterator[list["AssertionSequence"]]:
+    """
+    Collects the sequences of tested assertions instead of running them, see paf.aio
+    """
+    previous = getattr(_deferred, "sequences", None)
+    _deferred.sequences = []
+    try:
+        yield _deferred.sequences
+    finally:
+        _deferred.sequences = previous
+
+
+class AssertionSequence:
+    """
+    Tests an assertion by attempts, so that they can be retried by synchronous or asynchronous sequences.
+    """
+    def __init__(
+        self,
+        assertion: "AbstractAssertion",
+        test: Predicate,
+        additional_subject: Supplier = None,
+        browser_condition: dict = None,
+    ):
+        from paf.listener import AssertionListener
+        self._assertion = assertion
+        self._test = test
+        self._additional_subject = additional_subject
+        self._browser_condition = browser_condition if get_config().browser_polling else None
+        self._listener = inject.instance(AssertionListener)
+        self.sequence = create_sequence()
+
+    def run(self) -> bool:
+        try:
+            retry(self.attempt, sequence=self.sequence)
+        except RetryException as exception:
+            return self.failed(exception)
+        return self.passed()
+
+    def attempt(self):
+        from paf.metrics import command_origin
+        assertion = self._assertion
+        with command_origin(assertion._find_closest_ui_element() or assertion, "assert"):
+            try:
+                self.__perform_test()
+            except Exception as e:
+                ui_element = assertion._find_closest_ui_element()
+                if ui_element is not None:
+                    invalidate(ui_element.webdriver)
+                self._listener.assertion_failed(assertion, ui_element, e)
+                raise e
+
+    def __perform_test(self):
+        test = self._test
+        assertion = self._assertion
+        exception = None
+        try:
+            if test(assertion.actual):
+                return
+        except Exception as e:
+            if self._browser_condition is None:
+                raise e
+            exception = e
+
+        # Wait once for the condition within the browser, instead of polling it
+        if self._browser_condition is not None:
+            condition = self._browser_condition
+            self._browser_condition = None
+            ui_element = assertion._find_closest_ui_element()
+            if ui_element is not None:
+                start = time.time()
+                satisfied = ui_element._wait_for_condition(condition, self.sequence.remaining)
+                # The browser waited instead of the retries
+                self.sequence.consume(time.time() - start)
+                if satisfied:
+                    if test(assertion.actual):
+                        return
+                    exception = None
+
+        if exception is not None:
+            raise exception
+
+        raise AssertionError("Expected")
+
+    def passed(self) -> bool:
+        self._listener.assertion_passed(self._assertion, self._assertion._find_closest_ui_element())
+        return True
+
+    def failed(self, exception: RetryException) -> bool:
+        assertion = self._assertion
+        exception.add_subject(assertion.name_path)
+        if self._additional_subject:
+            exception.add_subject(self._additional_subject())
+        self._listener.assertion_failed_finally(assertion, assertion._find_closest_ui_element(), exception)
+
+        if assertion.raise_exception:
+            raise AssertionErrorWrapper(exception)
+            #AssertionErrorWrapper(AssertionError(f"{exception.enclosed_exception} {subject}"), sequence)
+        return False
+
+
 class AbstractAssertion(Generic[ACTUAL_TYPE], HasParent, ABC):
     def __init__(
         self,
         parent: None | HasName,
         actual_supplier: Supplier[ACTUAL_TYPE],
         name_supplier: Supplier[str],
-        raise_exception: bool = True
+        raise_exception: bool = True,
+        browser_property: dict = None,
     ):
         self._raise = raise_exception
 
@@ -39,7 +239,9 @@ class AbstractAssertion(Generic[ACTUAL_TYPE], HasParent, ABC):
         self.__parent = parent
         self._actual_supplier = actual_supplier
         self._name_supplier = name_supplier
+        self._browser_property = browser_property
         self._used = False
+        unused_assertions.register(self)
 
     @property
     def _parent(self):
@@ -67,33 +269,24 @@ class AbstractAssertion(Generic[ACTUAL_TYPE], HasParent, ABC):
         self._trace_path(_find)
         return ui_element
 
+    def _browser_condition(self, expected: any, negate: bool = False) -> dict | None:
+        if self._browser_property is None or not isinstance(expected, (str, int, float, bool, type(None))):
+            return None
+
+        return {**self._browser_property, "expected": expected, "negate": negate}
+
     def _test_sequence(
         self,
         test: Predicate[ACTUAL_TYPE],
         additional_subject: Supplier = None,
+        browser_condition: dict = None,
     ) -> bool:
-        from paf.listener import AssertionListener
-        assertion_listener = inject.instance(AssertionListener)
-
-        try:
-            def perform_test():
-                assert test(self.actual), "Expected"
-
-            retry(perform_test, lambda e: assertion_listener.assertion_failed(self, self._find_closest_ui_element(), e))
-            assertion_listener.assertion_passed(self, self._find_closest_ui_element())
+        sequence = AssertionSequence(self, test, additional_subject, browser_condition)
+        deferred = getattr(_deferred, "sequences", None)
+        if deferred is not None:
+            deferred.append(sequence)
             return True
-
-        except RetryException as exception:
-            exception.add_subject(self.name_path)
-            if additional_subject:
-                exception.add_subject(additional_subject())
-            #exception.update_sequence(sequence)
-            assertion_listener.assertion_failed_finally(self, self._find_closest_ui_element(), exception)
-
-            if self._raise:
-                raise AssertionErrorWrapper(exception)
-                #AssertionErrorWrapper(AssertionError(f"{exception.enclosed_exception} {subject}"), sequence)
-            return False
+        return sequence.run()
 
     @property
     def actual(self) -> ACTUAL_TYPE:
@@ -102,26 +295,32 @@ class AbstractAssertion(Generic[ACTUAL_TYPE], HasParent, ABC):
                 if not isinstance(inst, AbstractAssertion):
                     return False
 
-                inst._used = True
+                if not inst._used:
+                    inst._used = True
+                    unused_assertions.unregister(inst)
                 return True
             self._trace_path(_use)
 
         return self._actual_supplier()
 
-    def __del__(self):
-        if not self._used:
-            logging.warning(f"Unused Assertion: {self.name_path}")
-
 
 ASSERTION = TypeVar('ASSERTION', bound=AbstractAssertion)
 
 
 class BinaryAssertion(AbstractAssertion[ACTUAL_TYPE]):
     def be(self, expected: any) -> bool:
-        return self._test_sequence(lambda actual: actual == expected, lambda: f"to be {Format.param(expected)}")
+        return self._test_sequence(
+            lambda actual: actual == expected,
+            lambda: f"to be {Format.param(expected)}",
+            self._browser_condition(expected),
+        )
 
     def not_be(self, expected: any) -> bool:
-        return self._test_sequence(lambda actual: actual != expected, lambda: f"not to be {Format.param(expected)}")
+        return self._test_sequence(
+            lambda actual: actual != expected,
+            lambda: f"not to be {Format.param(expected)}",
+            self._browser_condition(expected, negate=True),
+        )
 
 
 class QuantityAssertion(BinaryAssertion[ACTUAL_TYPE]):
@@ -184,10 +383,15 @@ class StringAssertion(QuantityAssertion[str]):
         )
 
     def contains(self, expected: str):
+        browser_property = None
+        if self._browser_property is not None and "operator" not in self._browser_property:
+            browser_property = {**self._browser_property, "operator": "contains", "operand": expected}
+
         return BinaryAssertion(
             parent=self,
             actual_supplier=lambda: str(self._actual_supplier()).find(expected) >= 0,
             name_supplier=lambda: f"contains {Format.param(expected)}",
+            browser_property=browser_property,
         )
 
     def matches(self, regex: str | re.Pattern):
@@ -212,12 +416,22 @@ class StringAssertion(QuantityAssertion[str]):
 
     @property
     def length(self):
+        length = ObservedSupplier(lambda: len(self._actual_supplier()))
         return QuantityAssertion(
             parent=self,
-            actual_supplier=lambda: len(self._actual_supplier()),
-            name_supplier=lambda: f"length {Format.param(len(self._actual_supplier()))}",
+            actual_supplier=length,
+            name_supplier=lambda: f"length {Format.param(length.value)}",
         )
 
 
 class RectAssertion(AbstractAssertion[Rect]):
     pass
+
+
+class SnapshotAssertion(BinaryAssertion[ElementSnapshot]):
+    def map(self, mapper: Mapper[ElementSnapshot, any]):
+        return QuantityAssertion(
+            parent=self,
+            actual_supplier=lambda: mapper(self._actual_supplier()),
+            name_supplier=lambda: f" mapped ",
+        )
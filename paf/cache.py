@@ -0,0 +1,141 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Hashable
+
+from selenium.webdriver.remote.shadowroot import ShadowRoot
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+
+class CachedContext:
+    def __init__(
+        self,
+        web_element: WebElement,
+        context: WebElement | ShadowRoot,
+        is_frame: bool,
+        frame_path: tuple[WebElement, ...] | None = (),
+    ):
+        self.web_element = web_element
+        self.context = context
+        self.is_frame = is_frame
+        # The frames the element has been found in
+        self.frame_path = frame_path
+
+
+class SessionCache:
+    """
+    Caches the resolved WebElements of a WebDriver session, keyed by their locator chain.
+    Framed elements are cached along with their frame path, because their references
+    are only valid while the WebDriver is switched to the according frame.
+    """
+    def __init__(self, max_shadow_roots: int = 1024):
+        self._lock = threading.RLock()
+        self._max_shadow_roots = max_shadow_roots
+        self._shadow_roots: OrderedDict[str, bool] = OrderedDict()
+        self._contexts: dict[Hashable, CachedContext] = {}
+        self._script_fallbacks: set[Hashable] = set()
+        self._pinned_elements: dict[Hashable, WebElement] = {}
+        # The frames the session is switched to, None if unknown
+        self.frame_path: tuple[WebElement, ...] | None = None
+        # The DomSnapshot assertions are evaluated against, see paf.dom_snapshot
+        self.dom_snapshot = None
+
+    @property
+    def in_frame(self) -> bool:
+        return bool(self.frame_path)
+
+    def get_context(self, key: Hashable) -> CachedContext | None:
+        with self._lock:
+            return self._contexts.get(key)
+
+    def put_context(self, key: Hashable, context: CachedContext):
+        # The frames of the element are unknown
+        if context.frame_path is None:
+            return
+
+        with self._lock:
+            self._contexts[key] = context
+
+    def remove_context(self, key: Hashable):
+        with self._lock:
+            self._contexts.pop(key, None)
+
+    def is_script_fallback(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._script_fallbacks
+
+    def add_script_fallback(self, key: Hashable):
+        with self._lock:
+            self._script_fallbacks.add(key)
+
+    def get_pinned_element(self, key: Hashable) -> WebElement | None:
+        with self._lock:
+            return self._pinned_elements.get(key)
+
+    def pin_elements(self, elements: dict[Hashable, WebElement]):
+        if self.in_frame:
+            return
+
+        with self._lock:
+            self._pinned_elements.update(elements)
+
+    def unpin_elements(self, elements: dict[Hashable, WebElement]):
+        with self._lock:
+            for key, web_element in elements.items():
+                # Keeps the elements pinned again in the meantime
+                if self._pinned_elements.get(key) is web_element:
+                    del self._pinned_elements[key]
+
+    def clear_pinned_elements(self):
+        with self._lock:
+            self._pinned_elements.clear()
+
+    def has_shadow_root(self, element_id: str) -> bool | None:
+        with self._lock:
+            has_shadow_root = self._shadow_roots.get(element_id)
+            if has_shadow_root is not None:
+                self._shadow_roots.move_to_end(element_id)
+            return has_shadow_root
+
+    def set_shadow_root(self, element_id: str, has_shadow_root: bool):
+        with self._lock:
+            self._shadow_roots[element_id] = has_shadow_root
+            self._shadow_roots.move_to_end(element_id)
+            if len(self._shadow_roots) > self._max_shadow_roots:
+                self._shadow_roots.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            # The session may have been switched by someone else
+            self.frame_path = None
+            # Shadow roots may be attached later, so they need to be detected again
+            self._shadow_roots.clear()
+            self._contexts.clear()
+            self._script_fallbacks.clear()
+            self._pinned_elements.clear()
+            self.dom_snapshot = None
+
+
+__caches: weakref.WeakKeyDictionary[WebDriver, SessionCache] = weakref.WeakKeyDictionary()
+__caches_lock = threading.Lock()
+
+
+def get_cache(webdriver: WebDriver) -> SessionCache:
+    with __caches_lock:
+        cache = __caches.get(webdriver)
+        if cache is None:
+            cache = SessionCache()
+            __caches[webdriver] = cache
+        return cache
+
+
+def invalidate(webdriver: WebDriver):
+    if webdriver is None:
+        return
+
+    with __caches_lock:
+        cache = __caches.get(webdriver)
+
+    if cache is not None:
+        cache.clear()
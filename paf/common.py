@@ -1,10 +1,11 @@
+import asyncio
 import os
 import random
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum
 from time import sleep, time
-from typing import Callable, Self, TypedDict, Literal
+from typing import Callable, Self, TypedDict, Literal, Awaitable
 
 import inject
 
@@ -197,6 +198,58 @@ class Rect:
         return f"{self.__class__.__name__}({self.__dict__()})"
 
 
+class ElementSnapshot:
+    def __init__(self, data: dict):
+        self.__data = data
+        self.__bounds = Rect.from_rect_dict(data["rect"])
+        self.__viewport = Rect.from_rect_dict(data["viewport"])
+
+    @property
+    def text(self) -> str:
+        return self.__data["text"]
+
+    @property
+    def tag_name(self) -> str:
+        return self.__data["tagName"]
+
+    @property
+    def displayed(self) -> bool:
+        return self.__data["displayed"]
+
+    @property
+    def enabled(self) -> bool:
+        return self.__data["enabled"]
+
+    @property
+    def selected(self) -> bool:
+        return self.__data["selected"]
+
+    @property
+    def bounds(self) -> Rect:
+        return self.__bounds
+
+    @property
+    def viewport(self) -> Rect:
+        return self.__viewport
+
+    @property
+    def visible(self) -> bool:
+        return self.__viewport.intersects(self.__bounds)
+
+    @property
+    def fully_visible(self) -> bool:
+        return self.__viewport.contains(self.__bounds)
+
+    def attribute(self, attribute: str) -> str | None:
+        return self.__data["attributes"].get(attribute)
+
+    def css(self, property_name: str) -> str | None:
+        return self.__data["css"].get(property_name)
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self.__data})"
+
+
 class Property(Enum):
     PAF_SCREENSHOTS_DIR = "screenshots"
     PAF_WINDOW_SIZE = "1920x1080"
@@ -205,15 +258,60 @@ class Property(Enum):
     PAF_BROWSER_SETTING = "chrome"
     PAF_SEQUENCE_WAIT_AFTER_FAIL = 0.3
     PAF_SEQUENCE_RETRY_COUNT = 3
+    PAF_SEQUENCE_TIMEOUT = None
+    PAF_SEQUENCE_BACKOFF_FACTOR = 1
+    PAF_SEQUENCE_MAX_WAIT = None
+    PAF_SEQUENCE_JITTER = 0
     PAF_SELENIUM_SERVER_URL = None
     PAF_DEMO_MODE = "0"
     PAF_DRIVER_PATH = None
     PAF_BINARY_PATH = None
+    PAF_ELEMENT_CACHE = "1"
+    PAF_SCRIPT_RESOLUTION = "1"
+    PAF_BROWSER_POLLING = "0"
+    PAF_POOL_SIZE = 0
+    PAF_POOL_IDLE_TIMEOUT = 300
+    PAF_SCREENSHOT_QUEUE_SIZE = 16
+    PAF_ASYNC_MAX_WORKERS = 16
+    PAF_REMOTE_MAX_CONNECTIONS = 10
+    PAF_REMOTE_TIMEOUT = None
+    PAF_REMOTE_HTTP2 = "0"
+    PAF_COMMAND_METRICS = "0"
+    PAF_READINESS = None
+    PAF_READINESS_TIMEOUT = 10
+    PAF_FAST_FILL = "0"
+
+    def __new__(cls, default: any):
+        # Properties may share their default values, which would turn them into aliases of each other.
+        # So every property is numbered by its position and keeps its default as value.
+        prop = object.__new__(cls)
+        prop._value_ = len(cls._member_names_)
+        prop._default = default
+        return prop
+
+    @property
+    def value(self) -> any:
+        return self._default
+
+    @classmethod
+    def _missing_(cls, value: any) -> "Property | None":
+        # Allows looking up properties by their environment variable name or their default
+        prop = cls.__members__.get(value)
+        if prop is None:
+            prop = next((prop for prop in cls if prop.value == value), None)
+        return prop
 
     @staticmethod
     def env(prop: "Property") -> any:
         return os.getenv(prop.name, prop.value)
 
+    @staticmethod
+    def env_float(prop: "Property") -> float | None:
+        val = Property.env(prop)
+        if val is None or val == "":
+            return None
+        return float(val)
+
     @staticmethod
     def is_true(prop: "Property") -> bool:
         val = Property.env(prop)
@@ -264,20 +362,98 @@ class SubjectException(Exception):
 
 
 class Sequence:
-    def __init__(self, retry_count: int = 3, wait_after_fail: float = 0.2):
+    def __init__(
+            self,
+            retry_count: int = 3,
+            wait_after_fail: float = 0.2,
+            timeout: float = None,
+            backoff_factor: float = 1,
+            max_wait: float = None,
+            jitter: float = 0,
+    ):
         self._max = retry_count
         self._wait = wait_after_fail
+        self._timeout = timeout
+        self._backoff_factor = backoff_factor
+        self._max_wait = max_wait
+        self._jitter = jitter
         self._count = 0
         self._start_time = 0
+        self._next_wait = wait_after_fail
+
+    def _get_wait(self) -> float:
+        wait = self._next_wait
+        if self._max_wait is not None:
+            wait = min(wait, self._max_wait)
+
+        self._next_wait = wait * self._backoff_factor
+
+        if self._jitter:
+            wait *= 1 + self._jitter * random.uniform(-1, 1)
+        return max(wait, 0)
+
+    def _advance(self) -> float | None:
+        if self._timeout is None:
+            if self._count >= self._max:
+                return None
+            wait = self._get_wait()
+        else:
+            remaining = self._timeout - self.duration
+            if remaining <= 0:
+                return None
+            wait = min(self._get_wait(), remaining)
+
+        self._count += 1
+        return wait
 
     def run(self, sequence: Callable[[], bool]):
         self._start_time = time()
-        while True:
-            if sequence() or self._count >= self._max:
+        while not sequence():
+            wait = self._advance()
+            if wait is None:
                 break
+            sleep(wait)
 
+    async def run_async(self, sequence: Callable[[], Awaitable[bool]]):
+        self._start_time = time()
+        while not await sequence():
+            wait = self._advance()
+            if wait is None:
+                break
+            await asyncio.sleep(wait)
+
+    def consume(self, duration: float):
+        """
+        Accounts time spent waiting outside the sequence to its retries
+        """
+        # The deadline already includes the duration
+        if self._timeout is not None:
+            return
+
+        while self._count < self._max:
+            wait = self._next_wait if self._max_wait is None else min(self._next_wait, self._max_wait)
+            if wait > duration:
+                break
+            duration -= wait
+            self._next_wait = wait * self._backoff_factor
             self._count += 1
-            sleep(self._wait)
+
+    @property
+    def remaining(self) -> float:
+        """
+        The time left for retries, without jitter
+        """
+        if self._timeout is not None:
+            return max(self._timeout - self.duration, 0)
+
+        remaining = 0
+        wait = self._next_wait
+        for _ in range(self._count, self._max):
+            if self._max_wait is not None:
+                wait = min(wait, self._max_wait)
+            remaining += wait
+            wait *= self._backoff_factor
+        return remaining
 
     @property
     def duration(self):
@@ -1,11 +1,14 @@
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Type
+from typing import Type, Iterable, List, ContextManager
 
 from selenium.webdriver.support.color import Color
 
 from paf.common import HasParent, Locator
+from paf.dom import Attribute
 from paf.types import COMPONENT, PAGE, SUB_COMPONENT
-from paf.uielement import UiElement, PageObject, PageObjectList, UiElementTests, DefaultUiElement
+from paf.uielement import UiElement, PageObject, PageObjectList, UiElementTests, DefaultUiElement, prefetch, fill
 
 
 class Component(PageObject[COMPONENT], PageObjectList[COMPONENT], HasParent, UiElementTests):
@@ -30,6 +33,22 @@ class Component(PageObject[COMPONENT], PageObjectList[COMPONENT], HasParent, UiE
         ui_element = self._ui_element.find(by, name)
         return ui_element
 
+    @contextmanager
+    def prefetch(self, *page_objects: PageObject | Locator) -> ContextManager[list[PageObject]]:
+        """
+        Resolves the given elements within a single browser call, locators are found within this component.
+        """
+        page_objects = [self._find(item) if isinstance(item, Locator) else item for item in page_objects]
+        with prefetch(page_objects):
+            yield page_objects
+
+    def fill(self, values: dict[PageObject | Locator, str]):
+        """
+        Fills and verifies the given form fields within a single script call, locators are found within this component.
+        """
+        fill({self._find(key) if isinstance(key, Locator) else key: value for key, value in values.items()})
+        return self
+
     @property
     def name(self):
         return f"{self.__class__.__name__}"
@@ -48,8 +67,11 @@ class Component(PageObject[COMPONENT], PageObjectList[COMPONENT], HasParent, UiE
         self._ui_element.scroll_to_top(x, y)
 
     def __iter__(self):
-        for i in range(self._ui_element._count_elements()):
-            yield self.__getitem__(i)
+        for ui_element in self._ui_element:
+            yield self.__getitem__(ui_element._index)
+
+    def collect(self, text: bool = False, attributes: Iterable[str | Attribute] = ()) -> List[dict]:
+        return self._ui_element.collect(text, attributes)
 
     def __getitem__(self, index: int) -> COMPONENT:
         ui_element = DefaultUiElement(
@@ -80,3 +102,6 @@ class Component(PageObject[COMPONENT], PageObjectList[COMPONENT], HasParent, UiE
 
     def take_screenshot(self, file_name: str = None) -> Path | None:
         return self._ui_element.take_screenshot(file_name)
+
+    def capture_screenshot(self, file_name: str = None) -> Future[Path | None]:
+        return self._ui_element.capture_screenshot(file_name)
@@ -5,6 +5,8 @@ import paf.control
 import paf.manager
 import paf.page
 import paf.listener
+import paf.metrics
+import paf.screenshot
 
 
 def inject(binder: Binder):
@@ -12,3 +14,5 @@ def inject(binder: Binder):
     binder.install(paf.page.inject_config)
     binder.install(paf.common.inject_config)
     binder.install(paf.listener.inject_config)
+    binder.install(paf.screenshot.inject_config)
+    binder.install(paf.metrics.inject_config)
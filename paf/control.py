@@ -2,35 +2,79 @@ import dataclasses
 import threading
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Callable, Optional, Awaitable, Iterable
 
 from paf.common import Property, RetryException, Sequence, ExecutionSpeed
+from paf.readiness import ReadinessStrategy, from_names
 from paf.types import Consumer
 
 
 @dataclass()
 class Config(threading.local):
-    retry_count: int = Property.env(Property.PAF_SEQUENCE_RETRY_COUNT)
-    wait_after_fail: float = Property.env(Property.PAF_SEQUENCE_WAIT_AFTER_FAIL)
+    retry_count: int = int(Property.env(Property.PAF_SEQUENCE_RETRY_COUNT))
+    wait_after_fail: float = Property.env_float(Property.PAF_SEQUENCE_WAIT_AFTER_FAIL)
+    timeout: float = Property.env_float(Property.PAF_SEQUENCE_TIMEOUT)
+    backoff_factor: float = Property.env_float(Property.PAF_SEQUENCE_BACKOFF_FACTOR)
+    max_wait: float = Property.env_float(Property.PAF_SEQUENCE_MAX_WAIT)
+    jitter: float = Property.env_float(Property.PAF_SEQUENCE_JITTER)
     execution_speed: ExecutionSpeed = None
+    element_cache: bool = Property.is_true(Property.PAF_ELEMENT_CACHE)
+    script_resolution: bool = Property.is_true(Property.PAF_SCRIPT_RESOLUTION)
+    browser_polling: bool = Property.is_true(Property.PAF_BROWSER_POLLING)
+    readiness: tuple[ReadinessStrategy, ...] = from_names(Property.env(Property.PAF_READINESS))
+    readiness_timeout: float = Property.env_float(Property.PAF_READINESS_TIMEOUT)
+    fast_fill: bool = Property.is_true(Property.PAF_FAST_FILL)
 
 __config = Config()
+# Configurations applied to single threads, see use_config()
+__thread_configs = threading.local()
 
 
 def get_config():
-    return __config
+    return getattr(__thread_configs, "config", None) or __config
 
 
 def __set_config(config: Config):
-    global __config
-    __config = config
+    if getattr(__thread_configs, "config", None) is not None:
+        __thread_configs.config = config
+    else:
+        global __config
+        __config = config
+
+
+def copy_config() -> Config:
+    # Configs created with values are initialized with the same values in every thread
+    return dataclasses.replace(get_config())
+
+
+@contextmanager
+def use_config(config: Config):
+    """
+    Applies a configuration copied by copy_config() to the current thread only
+    """
+    config_backup = getattr(__thread_configs, "config", None)
+    __thread_configs.config = config
+    try:
+        yield
+    finally:
+        __thread_configs.config = config_backup
 
 
 @contextmanager
 def change(
     retry_count: int = None,
     wait_after_fail: float = None,
+    timeout: float = None,
+    backoff_factor: float = None,
+    max_wait: float = None,
+    jitter: float = None,
     execution_speed: ExecutionSpeed = None,
+    element_cache: bool = None,
+    script_resolution: bool = None,
+    browser_polling: bool = None,
+    readiness: Iterable[ReadinessStrategy] = None,
+    readiness_timeout: float = None,
+    fast_fill: bool = None,
 ):
     config_backup = get_config()
     scope_config = dataclasses.replace(config_backup)
@@ -42,18 +86,60 @@ def change(
     if wait_after_fail is not None:
         scope_config.wait_after_fail = wait_after_fail
 
+    if timeout is not None:
+        scope_config.timeout = timeout
+
+    if backoff_factor is not None:
+        scope_config.backoff_factor = backoff_factor
+
+    if max_wait is not None:
+        scope_config.max_wait = max_wait
+
+    if jitter is not None:
+        scope_config.jitter = jitter
+
     if execution_speed is not None:
         scope_config.execution_speed = execution_speed
 
+    if element_cache is not None:
+        scope_config.element_cache = element_cache
+
+    if script_resolution is not None:
+        scope_config.script_resolution = script_resolution
+
+    if browser_polling is not None:
+        scope_config.browser_polling = browser_polling
+
+    if readiness is not None:
+        scope_config.readiness = tuple(readiness)
+
+    if readiness_timeout is not None:
+        scope_config.readiness_timeout = readiness_timeout
+
+    if fast_fill is not None:
+        scope_config.fast_fill = fast_fill
+
     try:
         yield
     finally:
         __set_config(config_backup)
 
 
-def retry(action: Callable, on_fail: Consumer[Exception] = None):
+def create_sequence() -> Sequence:
     config = get_config()
-    sequence = Sequence(retry_count=config.retry_count, wait_after_fail=config.wait_after_fail)
+    return Sequence(
+        retry_count=config.retry_count,
+        wait_after_fail=config.wait_after_fail,
+        timeout=config.timeout,
+        backoff_factor=config.backoff_factor,
+        max_wait=config.max_wait,
+        jitter=config.jitter,
+    )
+
+
+def retry(action: Callable, on_fail: Consumer[Exception] = None, sequence: Sequence = None):
+    if sequence is None:
+        sequence = create_sequence()
     exception: Optional[Exception] = None
 
     def _run():
@@ -71,3 +157,29 @@ def retry(action: Callable, on_fail: Consumer[Exception] = None):
 
     if exception is not None:
         raise RetryException(exception, sequence)
+
+
+async def async_retry(
+        action: Callable[[], Awaitable],
+        on_fail: Consumer[Exception] = None,
+        sequence: Sequence = None,
+):
+    if sequence is None:
+        sequence = create_sequence()
+    exception: Optional[Exception] = None
+
+    async def _run():
+        nonlocal exception
+        try:
+            await action()
+            exception = None
+            return True
+        except Exception as e:
+            exception = e
+            if on_fail:
+                on_fail(e)
+
+    await sequence.run_async(_run)
+
+    if exception is not None:
+        raise RetryException(exception, sequence)
@@ -0,0 +1,259 @@
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import ContextManager, Hashable
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+import paf.javascript as script
+from paf.cache import get_cache
+
+try:
+    from lxml import etree
+    from cssselect import HTMLTranslator
+except ImportError:  # pragma: no cover
+    etree = None
+    HTMLTranslator = None
+
+# Markers of the serialized DOM, see javascript.get_dom_snapshot()
+SHADOW_ROOT = "paf-shadow-root"
+HIDDEN = "data-paf-hidden"
+VALUE = "data-paf-value"
+SELECTED = "data-paf-selected"
+DISABLED = "data-paf-disabled"
+# The rendered text depends on styles like text-transform, table layouts or preserved whitespace
+STYLED_TEXT = "data-paf-styled-text"
+# The computed display breaks the lines of the rendered text
+BLOCK = "data-paf-block"
+
+_FRAMES = ("frame", "iframe")
+_SHADOW_HOSTS = {
+    "article", "aside", "blockquote", "body", "div", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "main",
+    "nav", "p", "section", "span",
+}
+_BOOLEAN_ATTRIBUTES = ("disabled", "readonly", "required", "multiple", "hidden", "autofocus", "open")
+# Attributes whose DOM properties are the attribute values, like WebElement.get_attribute() returns them
+_PLAIN_ATTRIBUTES = ("id", "class", "name", "title", "placeholder", "alt", "for", "role")
+_PLAIN_ATTRIBUTE_PREFIXES = ("data-", "aria-")
+
+
+class NotEvaluableException(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Not evaluable offline: {reason}")
+
+
+@lru_cache(maxsize=1024)
+def _css_to_xpath(selector: str, prefix: str) -> str:
+    return HTMLTranslator().css_to_xpath(selector, prefix=prefix)
+
+
+def _step_selector(by: str, value: str) -> str | None:
+    if by in ("css selector", "tag name"):
+        return value
+    elif by == "id":
+        return f'[id="{value}"]'
+    elif by == "name":
+        return f'[name="{value}"]'
+    elif by == "class name":
+        return f".{value}"
+    return None
+
+
+def text(element: "etree._Element") -> str:
+    """
+    Approximates the rendered text of an element, like WebElement.text
+    """
+    parts = []
+
+    def _walk(node: "etree._Element"):
+        if node.get(HIDDEN) is not None:
+            return
+        if node.get(STYLED_TEXT) is not None:
+            raise NotEvaluableException(f"styled text of <{node.tag}>")
+        block = node.get(BLOCK) is not None or node.tag == "br"
+        if block:
+            parts.append("\n")
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            _walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if block:
+            parts.append("\n")
+
+    _walk(element)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def attribute(element: "etree._Element", name: str) -> str | None:
+    """
+    Matches the semantics of WebElement.get_attribute(), which prefers the element's property.
+    Properties differing from their attributes, like resolved URLs of `href` and `src`, are not evaluable.
+    """
+    name = name.lower()
+    if name == "value":
+        if element.get(VALUE) is None:
+            raise NotEvaluableException(f"value of <{element.tag}>")
+        return element.get(VALUE)
+    elif name in ("checked", "selected"):
+        return "true" if element.get(SELECTED) is not None else None
+    elif name in _BOOLEAN_ATTRIBUTES:
+        return "true" if element.get(name) is not None else None
+    elif name in _PLAIN_ATTRIBUTES or name.startswith(_PLAIN_ATTRIBUTE_PREFIXES):
+        return element.get(name)
+    raise NotEvaluableException(f"attribute {name}")
+
+
+def tag_name(element: "etree._Element") -> str:
+    return element.tag
+
+
+def displayed(element: "etree._Element") -> bool:
+    return element.get(HIDDEN) is None
+
+
+def enabled(element: "etree._Element") -> bool:
+    return element.get(DISABLED) is None
+
+
+def selected(element: "etree._Element") -> bool:
+    return element.get(SELECTED) is not None
+
+
+class DomSnapshot:
+    def __init__(self, html: str):
+        if etree is None:
+            raise Exception("DOM snapshots are not available, install python-automation-framework[snapshot]")
+
+        parser = etree.XMLParser(huge_tree=True, remove_blank_text=False)
+        self._root = etree.fromstring(html.encode("utf8"), parser)
+        self._results: dict[Hashable, list | None] = {}
+
+    @property
+    def root(self) -> "etree._Element":
+        return self._root
+
+    def find_chain(self, chain: list[dict], key: Hashable = None) -> list["etree._Element"] | None:
+        """
+        Evaluates a script resolution chain against the snapshot.
+        Returns None if the chain cannot be evaluated offline.
+        """
+        if key is not None and key in self._results:
+            return self._results[key]
+
+        try:
+            result = self.__find_chain(chain)
+        except NotEvaluableException:
+            result = None
+        if key is not None:
+            self._results[key] = result
+        return result
+
+    def __find_chain(self, chain: list[dict]) -> list["etree._Element"] | None:
+        context = self._root
+        for depth, step in enumerate(chain):
+            elements = self.__find_all(context, step)
+            if elements is None:
+                return None
+            elements = self.__filter(elements, step.get("conditions"))
+            if elements is None:
+                return None
+            if depth == len(chain) - 1:
+                # Closed shadow roots are not part of the snapshot, like javascript.find_elements_by_chain()
+                if len(elements) == 0 and self.__may_have_closed_shadow_root(context):
+                    return None
+                return elements
+
+            element = select(elements, step["unique"], step["index"])
+            # Frames are not part of the snapshot
+            if element is None or element.tag in _FRAMES:
+                return None
+            shadow_root = element.find(SHADOW_ROOT)
+            if shadow_root is None and step.get("shadow"):
+                return None
+            context = shadow_root if shadow_root is not None else element
+        return None
+
+    def __may_have_closed_shadow_root(self, context: "etree._Element") -> bool:
+        if context is self._root or context.tag == SHADOW_ROOT:
+            return False
+        return "-" in context.tag or context.tag in _SHADOW_HOSTS
+
+    def __find_all(self, context: "etree._Element", step: dict) -> list["etree._Element"] | None:
+        if step["by"] == "xpath":
+            if context.tag == SHADOW_ROOT:
+                return None
+            if context is self._root:
+                context = self._root.getroottree()
+            elements = [node for node in context.xpath(step["value"]) if isinstance(node, etree._Element)]
+        else:
+            selector = _step_selector(step["by"], step["value"])
+            if selector is None:
+                return None
+            # The document element is matched as well, when searching the document
+            prefix = "descendant-or-self::" if context is self._root else "descendant::"
+            elements = context.xpath(_css_to_xpath(selector, prefix))
+
+        return [element for element in elements if self.__in_scope(element, context)]
+
+    def __in_scope(self, element: "etree._Element", context: "etree._Element") -> bool:
+        # Elements of shadow roots cannot be found from outside the shadow root
+        if element.tag == SHADOW_ROOT or not isinstance(element.tag, str):
+            return False
+        if isinstance(context, etree._ElementTree):
+            context = self._root
+        parent = element.getparent()
+        while parent is not None and parent is not context:
+            if parent.tag == SHADOW_ROOT:
+                return False
+            parent = parent.getparent()
+        return True
+
+    def __filter(self, elements: list["etree._Element"], conditions: list[dict] | None) -> list["etree._Element"] | None:
+        for condition in conditions or ():
+            match condition["type"]:
+                case "displayed":
+                    elements = [element for element in elements if displayed(element)]
+                case "enabled":
+                    elements = [element for element in elements if enabled(element)]
+                case "text_contains":
+                    elements = [element for element in elements if condition["value"] in text(element)]
+                case "attribute":
+                    elements = [element for element in elements if attribute(element, condition["name"]) == condition["value"]]
+                case _:
+                    # The layout is not part of the snapshot
+                    return None
+        return elements
+
+
+def select(elements: list["etree._Element"], unique: bool, index: int) -> "etree._Element | None":
+    if unique and len(elements) != 1:
+        return None
+    if index < 0:
+        index += len(elements)
+    if index < 0 or index >= len(elements):
+        return None
+    return elements[index]
+
+
+def take_dom_snapshot(webdriver: WebDriver) -> DomSnapshot:
+    session_cache = get_cache(webdriver)
+    webdriver.switch_to.default_content()
+    session_cache.frame_path = ()
+    return DomSnapshot(script.get_dom_snapshot(webdriver))
+
+
+@contextmanager
+def dom_snapshot(webdriver: WebDriver) -> ContextManager[DomSnapshot]:
+    """
+    Evaluates read-only assertions against a snapshot of the DOM, until an action or a failure invalidates it.
+    """
+    session_cache = get_cache(webdriver)
+    snapshot = take_dom_snapshot(webdriver)
+    session_cache.dom_snapshot = snapshot
+    try:
+        yield snapshot
+    finally:
+        if session_cache.dom_snapshot is snapshot:
+            session_cache.dom_snapshot = None
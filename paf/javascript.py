@@ -1,9 +1,14 @@
+import pkgutil
+from functools import cache
+from typing import Iterable
+
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.color import Color
 
-from paf.common import Point, Rect
+from paf.common import Point, Rect, ElementSnapshot
 from paf.dom import Attribute
+from paf.readiness import ReadinessStrategy
 
 
 def scroll_to_center(webdriver: WebDriver, web_element: WebElement, offset: Point):
@@ -49,3 +54,552 @@ window.setTimeout(function() {
 def set_attribute(webdriver: WebDriver, web_element: WebElement, attribute: str | Attribute, value: any):
     webdriver.execute_script("""const element = arguments[0];
 element.setAttribute(arguments[1], arguments[2]);""", web_element, attribute, value)
+
+
+_FILTER_ELEMENTS = """function matchesConditions(element, conditions) {
+    for (const condition of conditions) {
+        switch (condition.type) {
+            case "displayed":
+                if (!isDisplayed.apply(null, [element])) {
+                    return false;
+                }
+                break;
+            case "enabled":
+                if (element.matches(":disabled")) {
+                    return false;
+                }
+                break;
+            case "text_contains": {
+                const text = element.innerText === undefined ? element.textContent : element.innerText;
+                if (String(text).indexOf(condition.value) < 0) {
+                    return false;
+                }
+                break;
+            }
+            case "attribute":
+                if (getAttribute.apply(null, [element, condition.name]) !== condition.value) {
+                    return false;
+                }
+                break;
+            case "in_viewport": {
+                const rect = element.getBoundingClientRect();
+                if (rect.bottom <= 0 || rect.right <= 0 || rect.top >= window.innerHeight || rect.left >= window.innerWidth) {
+                    return false;
+                }
+                break;
+            }
+        }
+    }
+    return true;
+}
+
+function filterElements(elements, conditions) {
+    if (!conditions || conditions.length === 0) {
+        return elements;
+    }
+    return elements.filter(function(element) { return matchesConditions(element, conditions); });
+}
+"""
+
+
+def _declare_atoms(conditions: Iterable[dict]) -> str:
+    # The atoms are large, so they are only sent when required by a condition
+    types = set(condition["type"] for condition in conditions)
+    is_displayed = _load_atom("isDisplayed") if "displayed" in types else "null"
+    get_attribute = _load_atom("getAttribute") if "attribute" in types else "null"
+    return f"""const isDisplayed = {is_displayed};
+const getAttribute = {get_attribute};
+"""
+
+
+def filter_elements(webdriver: WebDriver, web_elements: list[WebElement], conditions: list[dict]) -> list[WebElement]:
+    return webdriver.execute_script(f"""{_declare_atoms(conditions)}{_FILTER_ELEMENTS}
+return filterElements(arguments[0], arguments[1]);""", web_elements, conditions)
+
+
+_FIND_CHAIN = _FILTER_ELEMENTS + """function findAll(context, step) {
+    switch (step.by) {
+        case "xpath":
+            if (context instanceof ShadowRoot) {
+                return null;
+            }
+            const result = document.evaluate(step.value, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < result.snapshotLength; i++) {
+                const node = result.snapshotItem(i);
+                if (node.nodeType === Node.ELEMENT_NODE) {
+                    nodes.push(node);
+                }
+            }
+            return nodes;
+        case "css selector":
+        case "tag name":
+            return Array.from(context.querySelectorAll(step.value));
+        case "id":
+            return Array.from(context.querySelectorAll('[id="' + step.value + '"]'));
+        case "name":
+            return Array.from(context.querySelectorAll('[name="' + step.value + '"]'));
+        case "class name":
+            return Array.from(context.querySelectorAll("." + step.value));
+    }
+    return null;
+}
+
+// The elements, which shadow roots can be attached to
+const shadowHosts = new Set([
+    "article", "aside", "blockquote", "body", "div", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "main", "nav", "p", "section", "span",
+]);
+
+function mayHaveClosedShadowRoot(context) {
+    return context instanceof Element
+        && !context.shadowRoot
+        && (context.localName.includes("-") || shadowHosts.has(context.localName));
+}
+
+function selectElement(elements, step) {
+    if (step.unique && elements.length !== 1) {
+        return null;
+    }
+    const index = step.index < 0 ? elements.length + step.index : step.index;
+    if (index < 0 || index >= elements.length) {
+        return null;
+    }
+    return elements[index];
+}
+
+function findChain(chain) {
+    let context = document;
+    for (let depth = 0; depth < chain.length; depth++) {
+        const step = chain[depth];
+        let elements = findAll(context, step);
+        if (elements === null) {
+            return {fallback: true, unsupported: true};
+        }
+        elements = filterElements(elements, step.conditions);
+        if (depth === chain.length - 1) {
+            // Closed shadow roots are only accessible by WebDriver, so they cannot be proven empty
+            if (elements.length === 0 && mayHaveClosedShadowRoot(context)) {
+                return {fallback: true, shadow: true};
+            }
+            return {elements: elements};
+        }
+        const element = selectElement(elements, step);
+        if (element === null) {
+            return {fallback: true};
+        }
+        if (["FRAME", "IFRAME"].includes(element.tagName.toUpperCase())) {
+            return {fallback: true, frame: true};
+        }
+        if (step.shadow && !element.shadowRoot) {
+            return {fallback: true, shadow: true};
+        }
+        context = element.shadowRoot || element;
+    }
+    return {fallback: true};
+}
+
+function countChain(chain) {
+    const result = findChain(chain);
+    return result.elements ? {count: result.elements.length} : result;
+}
+
+function selectChain(chain) {
+    const result = findChain(chain);
+    if (!result.elements) {
+        return result;
+    }
+    const element = selectElement(result.elements, chain[chain.length - 1]);
+    return element === null ? {count: result.elements.length} : {element: element};
+}
+"""
+
+
+def find_elements_by_chain(webdriver: WebDriver, chain: list[dict]) -> dict:
+    conditions = [condition for step in chain for condition in step.get("conditions", [])]
+    result = webdriver.execute_script(f"""{_declare_atoms(conditions)}{_FIND_CHAIN}
+return findChain(arguments[0]);""", chain)
+    assert isinstance(result, dict)
+    return result
+
+
+def count_elements_by_chain(webdriver: WebDriver, chain: list[dict]) -> dict:
+    conditions = [condition for step in chain for condition in step.get("conditions", [])]
+    result = webdriver.execute_script(f"""{_declare_atoms(conditions)}{_FIND_CHAIN}
+return countChain(arguments[0]);""", chain)
+    assert isinstance(result, dict)
+    return result
+
+
+def select_element_by_chain(webdriver: WebDriver, chain: list[dict]) -> dict:
+    conditions = [condition for step in chain for condition in step.get("conditions", [])]
+    result = webdriver.execute_script(f"""{_declare_atoms(conditions)}{_FIND_CHAIN}
+return selectChain(arguments[0]);""", chain)
+    assert isinstance(result, dict)
+    return result
+
+
+_SET_VALUE = """function setValue(element, value) {
+    const prototypes = {input: HTMLInputElement, textarea: HTMLTextAreaElement, select: HTMLSelectElement};
+    const prototype = prototypes[element.localName];
+    const keysOnly = ["file", "checkbox", "radio", "button", "submit", "image", "reset"];
+    if (!prototype || keysOnly.includes(element.type) || element.disabled || element.readOnly) {
+        return null;
+    }
+    element.focus();
+    // The native setter bypasses value tracking of frameworks like React, which would swallow the events
+    Object.getOwnPropertyDescriptor(prototype.prototype, "value").set.call(element, value);
+    element.dispatchEvent(new Event("input", {bubbles: true}));
+    element.dispatchEvent(new Event("change", {bubbles: true}));
+    return element.value;
+}
+"""
+
+
+def set_value(webdriver: WebDriver, web_element: WebElement, value: str) -> str | None:
+    """
+    Sets the value of a form field and dispatches input and change events.
+    Returns the resulting value, or None if the field requires key events.
+    """
+    return webdriver.execute_script(f"""{_SET_VALUE}
+return setValue(arguments[0], arguments[1]);""", web_element, value)
+
+
+def fill_by_chains(webdriver: WebDriver, fields: list[dict]) -> list[dict]:
+    conditions = [condition for field in fields for step in field["chain"] for condition in step.get("conditions", [])]
+    result = webdriver.execute_script(f"""{_declare_atoms(conditions)}{_FIND_CHAIN}{_SET_VALUE}
+function fillChains(fields) {{
+    return fields.map(function(field) {{
+        const result = selectChain(field.chain);
+        if (!result.element) {{
+            return {{fallback: true}};
+        }}
+        const value = setValue(result.element, field.value);
+        return value === null ? {{fallback: true}} : {{value: value}};
+    }});
+}}
+return fillChains(arguments[0]);""", fields)
+    assert isinstance(result, list)
+    return result
+
+
+def find_elements_by_chains(webdriver: WebDriver, chains: list[list[dict]]) -> list[dict]:
+    conditions = [condition for chain in chains for step in chain for condition in step.get("conditions", [])]
+    result = webdriver.execute_script(f"""{_declare_atoms(conditions)}{_FIND_CHAIN}
+return arguments[0].map(findChain);""", chains)
+    assert isinstance(result, list)
+    return result
+
+
+def wait_for_condition(webdriver: WebDriver, chain: list[dict], condition: dict, timeout_ms: int) -> dict:
+    """
+    Waits until the condition is satisfied by the element chain.
+    Returns {satisfied: bool} or the fallback of chains or conditions which cannot be evaluated within the browser.
+    """
+    conditions = [condition for step in chain for condition in step.get("conditions", [])]
+    conditions.append({"type": condition["property"]})
+    result = webdriver.execute_async_script(f"""const chain = arguments[0];
+const condition = arguments[1];
+const timeout = arguments[2];
+const callback = arguments[arguments.length - 1];
+{_declare_atoms(conditions)}{_FIND_CHAIN}
+function readValue(elements, step) {{
+    if (condition.property === "count") {{
+        return elements.length;
+    }}
+    const element = selectElement(elements, step);
+    if (element === null) {{
+        return undefined;
+    }}
+    switch (condition.property) {{
+        case "text":
+            return element.innerText === undefined ? element.textContent : element.innerText;
+        case "attribute":
+            return getAttribute.apply(null, [element, condition.name]);
+        case "displayed":
+            return isDisplayed.apply(null, [element]);
+    }}
+    throw new Error("Unsupported property: " + condition.property);
+}}
+
+function test() {{
+    try {{
+        const result = findChain(chain);
+        // Frames and unsupported steps will never be resolved by waiting
+        if (result.frame || result.unsupported) {{
+            return result;
+        }}
+        if (!result.elements) {{
+            return {{satisfied: false}};
+        }}
+        let value = readValue(result.elements, chain[chain.length - 1]);
+        if (value === undefined) {{
+            return {{satisfied: false}};
+        }}
+        if (condition.operator === "contains") {{
+            value = value !== null && String(value).indexOf(condition.operand) >= 0;
+        }}
+        const equals = value === condition.expected;
+        return {{satisfied: condition.negate ? !equals : equals}};
+    }} catch (e) {{
+        return {{fallback: true}};
+    }}
+}}
+
+const first = test();
+if (first.satisfied !== false) {{
+    callback(first);
+}} else {{
+    let done = false;
+    const finish = function(result) {{
+        if (done) {{
+            return;
+        }}
+        done = true;
+        observer.disconnect();
+        window.clearInterval(interval);
+        window.clearTimeout(timer);
+        callback(result);
+    }};
+    const check = function() {{
+        if (done) {{
+            return;
+        }}
+        const result = test();
+        if (result.satisfied !== false) {{
+            finish(result);
+        }}
+    }};
+    const observer = new MutationObserver(check);
+    observer.observe(document, {{subtree: true, childList: true, attributes: true, characterData: true}});
+    // Catches changes which are not observable, like in shadow roots or by stylesheets
+    const interval = window.setInterval(check, 100);
+    const timer = window.setTimeout(function() {{ finish(test()); }}, timeout);
+}}""", chain, condition, timeout_ms)
+    assert isinstance(result, dict)
+    return result
+
+
+def wait_for_readiness(webdriver: WebDriver, strategies: Iterable[ReadinessStrategy], timeout_ms: int) -> bool:
+    strategies = list(strategies)
+    setups = "\n".join(f"try {{\n{strategy.setup}\n}} catch (e) {{}}" for strategy in strategies if strategy.setup)
+    predicates = ",\n".join(f"function() {{ return {strategy.predicate}; }}" for strategy in strategies)
+    result = webdriver.execute_async_script(f"""const timeout = arguments[0];
+const callback = arguments[arguments.length - 1];
+{setups}
+const predicates = [
+{predicates}
+];
+
+function isReady() {{
+    try {{
+        return predicates.every(function(predicate) {{ return predicate() === true; }});
+    }} catch (e) {{
+        return false;
+    }}
+}}
+
+if (isReady()) {{
+    callback(true);
+}} else {{
+    let done = false;
+    const finish = function(result) {{
+        if (done) {{
+            return;
+        }}
+        done = true;
+        window.clearInterval(interval);
+        window.clearTimeout(timer);
+        callback(result);
+    }};
+    // Idle strategies become ready by time passing, so polling is required
+    const interval = window.setInterval(function() {{
+        if (!done && isReady()) {{
+            finish(true);
+        }}
+    }}, 50);
+    const timer = window.setTimeout(function() {{ finish(isReady()); }}, timeout);
+}}""", timeout_ms)
+    return result is True
+
+
+@cache
+def _load_atom(name: str) -> str:
+    return pkgutil.get_data("selenium.webdriver.remote", f"{name}.js").decode("utf8")
+
+
+def collect(
+        webdriver: WebDriver,
+        web_elements: list[WebElement],
+        text: bool = False,
+        attributes: Iterable[str] = (),
+) -> list[dict]:
+    attributes = list(attributes)
+    atom = _load_atom("getAttribute") if len(attributes) > 0 else "null"
+    return webdriver.execute_script(f"""const elements = arguments[0];
+const text = arguments[1];
+const attributes = arguments[2];
+const getAttribute = {atom};
+
+return elements.map(function(element) {{
+    const item = {{}};
+    if (text) {{
+        item.text = element.innerText === undefined ? element.textContent : element.innerText;
+    }}
+    if (attributes.length > 0) {{
+        item.attributes = {{}};
+        for (const attribute of attributes) {{
+            item.attributes[attribute] = getAttribute.apply(null, [element, attribute]);
+        }}
+    }}
+    return item;
+}});""", web_elements, text, attributes)
+
+
+_BOUNDS = """const rect = element.getBoundingClientRect();
+const bounds = {
+    rect: {x: rect.left + window.pageXOffset, y: rect.top + window.pageYOffset, width: rect.width, height: rect.height},
+    viewport: {x: window.pageXOffset, y: window.pageYOffset, width: window.innerWidth, height: window.innerHeight},
+};
+"""
+
+
+def get_bounds(webdriver: WebDriver, web_element: WebElement) -> tuple[Rect, Rect]:
+    """
+    Returns the element's bounds and the viewport in document coordinates
+    """
+    data = webdriver.execute_script(f"""const element = arguments[0];
+{_BOUNDS}return bounds;""", web_element)
+    assert isinstance(data, dict)
+    return Rect.from_rect_dict(data["rect"]), Rect.from_rect_dict(data["viewport"])
+
+
+def get_snapshot(
+        webdriver: WebDriver,
+        web_element: WebElement,
+        attributes: Iterable[str] = (),
+        css: Iterable[str] = (),
+) -> ElementSnapshot:
+    attributes = list(attributes)
+    get_attribute = _load_atom("getAttribute") if len(attributes) > 0 else "null"
+    data = webdriver.execute_script(f"""const element = arguments[0];
+const attributes = arguments[1];
+const properties = arguments[2];
+const isDisplayed = {_load_atom("isDisplayed")};
+const getAttribute = {get_attribute};
+{_BOUNDS}
+const style = window.getComputedStyle(element);
+const snapshot = {{
+    text: element.innerText === undefined ? element.textContent : element.innerText,
+    tagName: element.tagName.toLowerCase(),
+    displayed: isDisplayed.apply(null, [element]),
+    enabled: !element.matches(":disabled"),
+    selected: !!(element.selected || element.checked),
+    rect: bounds.rect,
+    viewport: bounds.viewport,
+    attributes: {{}},
+    css: {{}},
+}};
+for (const attribute of attributes) {{
+    snapshot.attributes[attribute] = getAttribute.apply(null, [element, attribute]);
+}}
+for (const property of properties) {{
+    snapshot.css[property] = style.getPropertyValue(property);
+}}
+return snapshot;""", web_element, attributes, list(css))
+    assert isinstance(data, dict)
+    return ElementSnapshot(data)
+
+
+def get_dom_snapshot(webdriver: WebDriver) -> str:
+    """
+    Serializes the document including open shadow roots as XML, see paf.dom_snapshot
+    """
+    return webdriver.execute_script("""const parts = [];
+const attributeName = /^[A-Za-z_][\\w.-]*$/;
+const skipContent = new Set(["script", "style", "noscript", "template"]);
+const inlineDisplays = new Set(["inline", "inline-block", "inline-table", "none", "table-cell", "table-column", "table-column-group"]);
+
+function escape(value) {
+    return String(value)
+        .replace(/[\\u0000-\\u0008\\u000B\\u000C\\u000E-\\u001F]/g, "")
+        .replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;").replace(/"/g, "&quot;");
+}
+
+function isVisible(element) {
+    if (element.localName === "option") {
+        const select = element.closest("select");
+        return select ? isVisible(select) : true;
+    }
+    if (element.checkVisibility) {
+        return element.checkVisibility({opacityProperty: true, visibilityProperty: true});
+    }
+    const style = window.getComputedStyle(element);
+    return style.display !== "none" && style.visibility !== "hidden" && style.opacity !== "0";
+}
+
+function hasStyledText(element) {
+    const style = window.getComputedStyle(element);
+    return style.textTransform !== "none"
+        || style.display.includes("table")
+        || (style.whiteSpace !== "normal" && style.whiteSpace !== "nowrap");
+}
+
+// Like the line breaks of WebElement.text
+function isBlock(element) {
+    return !inlineDisplays.has(window.getComputedStyle(element).display);
+}
+
+function serializeNode(node, hidden) {
+    if (node.nodeType === Node.TEXT_NODE) {
+        parts.push(escape(node.data));
+        return;
+    }
+    if (node.nodeType !== Node.ELEMENT_NODE) {
+        return;
+    }
+    const name = node.localName;
+    hidden = hidden || !isVisible(node);
+    parts.push("<", name);
+    for (const attribute of node.attributes) {
+        if (attributeName.test(attribute.name) && !attribute.name.startsWith("xmlns")) {
+            parts.push(" ", attribute.name, '="', escape(attribute.value), '"');
+        }
+    }
+    if (name === "input" || name === "textarea" || name === "select") {
+        parts.push(' data-paf-value="', escape(node.value), '"');
+    }
+    if (node.checked || node.selected) {
+        parts.push(' data-paf-selected=""');
+    }
+    if (node.matches(":disabled")) {
+        parts.push(' data-paf-disabled=""');
+    }
+    if (hidden) {
+        parts.push(' data-paf-hidden=""');
+    } else {
+        if (hasStyledText(node)) {
+            parts.push(' data-paf-styled-text=""');
+        }
+        if (isBlock(node)) {
+            parts.push(' data-paf-block=""');
+        }
+    }
+    parts.push(">");
+    if (node.shadowRoot) {
+        parts.push("<paf-shadow-root>");
+        for (const child of node.shadowRoot.childNodes) {
+            serializeNode(child, hidden);
+        }
+        parts.push("</paf-shadow-root>");
+    }
+    if (!skipContent.has(name)) {
+        for (const child of node.childNodes) {
+            serializeNode(child, hidden);
+        }
+    }
+    parts.push("</", name, ">");
+}
+
+serializeNode(document.documentElement, false);
+return parts.join("");""")
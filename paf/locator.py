@@ -11,6 +11,8 @@ class By:
         self._value = value
         self._unique = False
         self._filter = None
+        self._conditions: tuple[dict, ...] = ()
+        self._shadow = False
 
     @property
     def by(self):
@@ -24,6 +26,8 @@ class By:
         by = By(self._by, self._value)
         by._unique = self._unique
         by._filter = self._filter
+        by._conditions = self._conditions
+        by._shadow = self._shadow
         return by
 
     @property
@@ -37,16 +41,47 @@ class By:
         by._filter = filter
         return by
 
+    def _condition(self, condition: dict):
+        by = self._copy()
+        by._conditions = self._conditions + (condition,)
+        return by
+
     @property
     def displayed(self):
-        def _displayed(webelement: WebElement):
-            return webelement.is_displayed()
+        return self._condition({"type": "displayed"})
+
+    @property
+    def enabled(self):
+        return self._condition({"type": "enabled"})
+
+    @property
+    def in_viewport(self):
+        return self._condition({"type": "in_viewport"})
+
+    def text_contains(self, text: str):
+        return self._condition({"type": "text_contains", "value": text})
 
-        return self.filter(_displayed)
+    def attribute_equals(self, attribute: str | Attribute, value: str):
+        if isinstance(attribute, Attribute):
+            attribute = attribute.value
+        return self._condition({"type": "attribute", "name": attribute, "value": value})
+
+    @property
+    def shadow(self):
+        by = self._copy()
+        by._shadow = True
+        return by
+
+    @property
+    def has_shadow_root(self):
+        return self._shadow
 
     def get_filter(self):
         return self._filter
 
+    def get_conditions(self) -> tuple[dict, ...]:
+        return self._conditions
+
     @property
     def is_unique(self):
         return self._unique
@@ -81,7 +116,7 @@ class By:
 
     def __str__(self) -> str:
         id = f"By.{self._by}({self._value})"
-        if self._filter:
+        if self._filter or self._conditions:
             id += " filtered"
         return id
 
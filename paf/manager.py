@@ -1,6 +1,9 @@
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime
 from pathlib import Path
-from typing import Type, TypeVar, List
+from typing import Type, TypeVar, List, Iterable
 
 import inject
 import selenium
@@ -9,9 +12,14 @@ from selenium.webdriver.common import service as webdriver_service
 from selenium.webdriver.common.options import BaseOptions
 from selenium.webdriver.remote.webdriver import WebDriver, BaseWebDriver
 
+from paf.cache import invalidate
 from paf.common import Property, Formatter, Cookie
 from paf.listener import WebDriverManagerListener
+from paf.pool import WebDriverPool
 from paf.request import WebDriverRequest
+from paf.screenshot import ScreenshotWriter
+from paf.transport import RemoteTransport
+from paf.types import Consumer
 
 OPTION = TypeVar("OPTION")
 
@@ -19,7 +27,32 @@ OPTION = TypeVar("OPTION")
 class WebDriverManager:
     def __init__(self):
         self._session_driver_map: dict[str, WebDriver] = {}
+        self._driver_session_map: dict[WebDriver, str] = {}
         self._thread_driver_map: dict[int, WebDriver] = {}
+        self._creation_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.RLock()
+        self._session_profile_map: dict[str, str] = {}
+        self._session_origin_map: dict[str, WebDriver] = {}
+        self._pool = WebDriverPool(
+            max_size=int(Property.env(Property.PAF_POOL_SIZE)),
+            idle_timeout=Property.env_float(Property.PAF_POOL_IDLE_TIMEOUT),
+        )
+        if self._pool.enabled:
+            atexit.register(self._pool.shutdown)
+        self._transport = RemoteTransport(
+            max_connections=int(Property.env(Property.PAF_REMOTE_MAX_CONNECTIONS)),
+            timeout=Property.env_float(Property.PAF_REMOTE_TIMEOUT),
+            http2=Property.is_true(Property.PAF_REMOTE_HTTP2),
+        )
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._shutdown_callbacks: list[Consumer[WebDriver]] = []
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="paf-webdriver")
+            return self._executor
 
     def _get_options(self, request: WebDriverRequest, options_class: Type[OPTION]) -> OPTION:
         options = request.options
@@ -30,11 +63,72 @@ class WebDriverManager:
 
         return options
 
-    def get_webdriver(self, request: WebDriverRequest) -> WebDriver:
-        session_name = request.name
-        if session_name in self._session_driver_map:
-            return self._session_driver_map[session_name]
+    def get_webdriver(self, request: WebDriverRequest = None) -> WebDriver:
+        thread_id = threading.get_ident()
+        if request is None:
+            webdriver = self._thread_driver_map.get(thread_id)
+            if webdriver is not None:
+                return webdriver
+            request = WebDriverRequest()
+
+        webdriver = self.__get_or_start_webdriver(request)
+        with self._lock:
+            self._thread_driver_map.setdefault(thread_id, webdriver)
+        return webdriver
 
+    def __get_creation_lock(self, session_name: str) -> threading.Lock:
+        with self._lock:
+            lock = self._creation_locks.get(session_name)
+            if lock is None:
+                lock = threading.Lock()
+                self._creation_locks[session_name] = lock
+            return lock
+
+    def __get_or_start_webdriver(self, request: WebDriverRequest) -> WebDriver:
+        session_name = request.name
+        webdriver = self._session_driver_map.get(session_name)
+        if webdriver is not None:
+            return webdriver
+
+        # Only one thread starts the session, others wait for it
+        with self.__get_creation_lock(session_name):
+            webdriver = self._session_driver_map.get(session_name)
+            if webdriver is not None:
+                return webdriver
+            return self.__start_webdriver(request)
+
+    def __start_webdriver(self, request: WebDriverRequest) -> WebDriver:
+        session_name = request.name
+        if not self._pool.enabled or not request.pooled:
+            return self.introduce_webdriver(self._create_webdriver(request), request)
+
+        profile = self._pool.get_profile(request)
+        webdriver = self._pool.acquire(profile)
+        if webdriver is None:
+            webdriver = self._create_webdriver(request)
+
+        with self._lock:
+            self._session_profile_map[session_name] = profile
+            self._session_origin_map[session_name] = webdriver
+        return self.introduce_webdriver(webdriver, request)
+
+    def get_webdrivers(self, requests: Iterable[WebDriverRequest]) -> List[Future[WebDriver]]:
+        executor = self.__get_executor()
+        return [executor.submit(self.__get_or_start_webdriver, request) for request in requests]
+
+    def prestart(self, request: WebDriverRequest, count: int = 1):
+        if not self._pool.enabled:
+            raise Exception(f"WebDriver pool is disabled, set {Property.PAF_POOL_SIZE.name}")
+
+        profile = self._pool.get_profile(request)
+        executor = self.__get_executor()
+        futures = [executor.submit(self._create_webdriver, request) for _ in range(min(count, self._pool.free))]
+        for future in futures:
+            webdriver = future.result()
+            if not self._pool.put(profile, webdriver):
+                webdriver.quit()
+
+    def _create_webdriver(self, request: WebDriverRequest) -> WebDriver:
         webdriver = None
         webdriver_class: Type[BaseWebDriver]
         options: BaseOptions
@@ -67,20 +161,19 @@ class WebDriverManager:
             listener.webdriver_create(request)
 
         if request.server_url:
-            webdriver = selenium.webdriver.Remote(command_executor=request.server_url.geturl(), options=options)
+            command_executor = self._transport.create_connection(request.server_url.geturl(), options.to_capabilities())
+            webdriver = selenium.webdriver.Remote(command_executor=command_executor, options=options)
         elif webdriver_class:
             service_options = {}
-            if Property.PAF_DRIVER_PATH.value:
-                service_options["executable_path"] = Property.PAF_DRIVER_PATH.value
+            if Property.env(Property.PAF_DRIVER_PATH):
+                service_options["executable_path"] = Property.env(Property.PAF_DRIVER_PATH)
 
-            if Property.PAF_BINARY_PATH.value:
-                options.binary_location = Property.PAF_BINARY_PATH.value
+            if Property.env(Property.PAF_BINARY_PATH):
+                options.binary_location = Property.env(Property.PAF_BINARY_PATH)
 
             service = service_class(**service_options)
             webdriver = webdriver_class(options=options, service=service)
 
-        webdriver = self.introduce_webdriver(webdriver, request)
-
         return webdriver
 
     def introduce_webdriver(self, webdriver: WebDriver, request: WebDriverRequest) -> WebDriver:
@@ -90,7 +183,12 @@ class WebDriverManager:
             webdriver = listener.webdriver_introduce(webdriver)
             assert webdriver is not None
 
-        self._session_driver_map[request.name] = webdriver
+        with self._lock:
+            previous = self._session_driver_map.get(request.name)
+            if previous is not None:
+                self._driver_session_map.pop(previous, None)
+            self._session_driver_map[request.name] = webdriver
+            self._driver_session_map[webdriver] = request.name
 
         if request.window_position:
             webdriver.set_window_position(request.window_position.x, request.window_position.y)
@@ -117,25 +215,52 @@ class WebDriverManager:
 
     def shutdown_session(self, session_name_or_request: str | WebDriverRequest):
         session_name = self.__map_session_name(session_name_or_request)
-        if session_name in self._session_driver_map:
-            self.shutdown(self._session_driver_map[session_name])
+        webdriver = self._session_driver_map.get(session_name)
+        if webdriver is not None:
+            self.shutdown(webdriver)
         else:
             raise Exception(f"Unknown session: {session_name}")
 
     def shutdown(self, webdriver: WebDriver):
-        webdriver.quit()
-        webdrivers = list(self._session_driver_map.values())
-        index = webdrivers.index(webdriver)
-
-        session_keys = list(self._session_driver_map.keys())
-        key = session_keys[index]
-        self._session_driver_map.pop(key)
+        with self._lock:
+            key = self._driver_session_map.pop(webdriver, None)
+            if key is None:
+                raise Exception(f"Unknown WebDriver: {webdriver}")
+
+            self._session_driver_map.pop(key)
+            profile = self._session_profile_map.pop(key, None)
+            origin = self._session_origin_map.pop(key, None)
+            for thread_id, thread_webdriver in list(self._thread_driver_map.items()):
+                if thread_webdriver is webdriver:
+                    self._thread_driver_map.pop(thread_id)
+
+        invalidate(webdriver)
+        if profile is None or not self._pool.release(profile, origin):
+            webdriver.quit()
+
+        for callback in list(self._shutdown_callbacks):
+            callback(webdriver)
+
+    def add_shutdown_callback(self, callback: Consumer[WebDriver]):
+        """
+        Registers a callback called after every WebDriver shutdown
+        """
+        with self._lock:
+            self._shutdown_callbacks.append(callback)
+
+    def remove_shutdown_callback(self, callback: Consumer[WebDriver]):
+        with self._lock:
+            if callback in self._shutdown_callbacks:
+                self._shutdown_callbacks.remove(callback)
 
     def shutdown_all(self):
-        for webdriver in list(self._session_driver_map.values()):
+        for webdriver in self.webdrivers:
             self.shutdown(webdriver)
 
     def take_screenshot(self, webdriver: WebDriver, file_name: str = None) -> Path | None:
+        return self.capture_screenshot(webdriver, file_name).result()
+
+    def capture_screenshot(self, webdriver: WebDriver, file_name: str = None) -> Future[Path | None]:
         dir = Path(Property.env(Property.PAF_SCREENSHOTS_DIR))
         if empty(file_name):
             title = webdriver.title
@@ -144,19 +269,27 @@ class WebDriverManager:
             formatter = inject.instance(Formatter)
             file_name = f"{webdriver.session_id}-{title}-{formatter.datetime(datetime.now())}.png"
 
-        dir.mkdir(parents=True, exist_ok=True)
-        path = dir / file_name
-        if webdriver.save_screenshot(dir / file_name):
-            return path
-        else:
-            return None
+        screenshot = webdriver.get_screenshot_as_base64()
+        return inject.instance(ScreenshotWriter).write(dir / file_name, screenshot)
 
     @property
     def webdrivers(self) -> List[WebDriver]:
-        return list(self._session_driver_map.values())
+        with self._lock:
+            return list(self._session_driver_map.values())
 
     def get_request_name(self, webdriver: WebDriver):
-        return webdriver.capabilities.get("paf:requestName")
+        name = self._driver_session_map.get(webdriver)
+        if name is None:
+            name = webdriver.capabilities.get("paf:requestName")
+        return name
+
+    @property
+    def pool(self) -> WebDriverPool:
+        return self._pool
+
+    @property
+    def transport(self) -> RemoteTransport:
+        return self._transport
 
     def __set_request_name(self, webdriver: WebDriver, request: WebDriverRequest):
         webdriver.capabilities.setdefault("paf:requestName", request.name)
@@ -0,0 +1,247 @@
+import bisect
+import math
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import ContextManager
+
+import inject
+from selenium.webdriver.remote import utils
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from paf.common import Property, HasParent
+from paf.listener import WebDriverManagerListener
+
+__origin = threading.local()
+
+
+@contextmanager
+def command_origin(source: HasParent, action_name: str) -> ContextManager:
+    """
+    Attributes the WebDriver commands executed by the current thread to the given source and action.
+    """
+    previous = getattr(__origin, "value", None)
+    __origin.value = (source, action_name)
+    try:
+        yield
+    finally:
+        __origin.value = previous
+
+
+def get_command_origin() -> tuple[HasParent | None, str | None]:
+    return getattr(__origin, "value", None) or (None, None)
+
+
+@dataclass(frozen=True)
+class CommandKey:
+    session: str | None
+    test: str | None
+    name_path: str | None
+    action: str | None
+    command: str
+
+
+@dataclass(frozen=True)
+class _RecordKey:
+    # The name path of the source is built at report time, since it may execute commands on its own
+    session: str | None
+    test: str | None
+    source: HasParent | None
+    action: str | None
+    command: str
+
+
+class Histogram:
+    # Upper bounds of the buckets in seconds
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf)
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.total = 0.
+        self.min = math.inf
+        self.max = 0.
+        self.payload_size = 0
+
+    def add(self, duration: float, payload_size: int = 0):
+        self.counts[bisect.bisect_left(self.BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+        self.payload_size += payload_size
+
+    def merge(self, other: "Histogram"):
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.payload_size += other.payload_size
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns the upper bound of the bucket containing the given percentile, limited to the maximum duration.
+        """
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for bound, count in zip(self.BUCKETS, self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return 0.
+
+    def __str__(self):
+        return (
+            f"count={self.count} total={self.total:.3f}s mean={self.mean * 1000:.1f}ms "
+            f"p50={self.percentile(50) * 1000:.1f}ms p95={self.percentile(95) * 1000:.1f}ms "
+            f"max={self.max * 1000:.1f}ms payload={self.payload_size}B"
+        )
+
+
+class InstrumentedCommandExecutor:
+    def __init__(self, command_executor: any, metrics: "CommandMetrics", session: str | None):
+        self._command_executor = command_executor
+        self._metrics = metrics
+        self.session = session
+
+    @property
+    def command_executor(self):
+        return self._command_executor
+
+    def execute(self, command: str, params: dict):
+        # The executor removes the path parameters from the payload
+        payload_size = len(utils.dump_json(params)) if params else 0
+        start = perf_counter()
+        try:
+            return self._command_executor.execute(command, params)
+        finally:
+            self._metrics.record(self.session, command, perf_counter() - start, payload_size)
+
+    def __getattr__(self, name: str):
+        return getattr(self._command_executor, name)
+
+
+class CommandMetrics(WebDriverManagerListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: dict[_RecordKey, Histogram] = {}
+        self._histograms: dict[CommandKey, Histogram] = {}
+        self._test: str | None = None
+        # Set while the name paths are built, to ignore their own commands
+        self._naming = threading.local()
+
+    @property
+    def test(self) -> str | None:
+        if self._test is not None:
+            return self._test
+
+        # Set by pytest for the currently running test
+        current_test = os.getenv("PYTEST_CURRENT_TEST")
+        if current_test:
+            return current_test.split(" ")[0]
+        return None
+
+    @test.setter
+    def test(self, test: str | None):
+        self._test = test
+
+    def webdriver_introduce(self, webdriver: WebDriver) -> any:
+        session = webdriver.capabilities.get("paf:requestName")
+        command_executor = webdriver.command_executor
+        if isinstance(command_executor, InstrumentedCommandExecutor):
+            # Pooled sessions are introduced again
+            command_executor.session = session
+        else:
+            webdriver.command_executor = InstrumentedCommandExecutor(command_executor, self, session)
+        return webdriver
+
+    def record(self, session: str | None, command: str, duration: float, payload_size: int = 0):
+        if getattr(self._naming, "active", False):
+            return
+
+        source, action_name = get_command_origin()
+        key = _RecordKey(session, self.test, source, action_name, command)
+
+        with self._lock:
+            histogram = self._records.get(key)
+            if histogram is None:
+                histogram = Histogram()
+                self._records[key] = histogram
+            histogram.add(duration, payload_size)
+
+    @staticmethod
+    def __name_path(source: HasParent | None) -> str | None:
+        if source is None:
+            return None
+        try:
+            return source.name_path
+        except Exception:
+            # The session of the source may already be closed
+            return source.__class__.__name__
+
+    def __name_records(self):
+        with self._lock:
+            records = self._records
+            self._records = {}
+
+        # Naming happens outside the lock, because it may execute commands
+        self._naming.active = True
+        try:
+            named = [
+                (CommandKey(key.session, key.test, self.__name_path(key.source), key.action, key.command), histogram)
+                for key, histogram in records.items()
+            ]
+        finally:
+            self._naming.active = False
+
+        with self._lock:
+            for key, histogram in named:
+                existing = self._histograms.get(key)
+                if existing is None:
+                    self._histograms[key] = histogram
+                else:
+                    existing.merge(histogram)
+
+    def histograms(self, *group_by: str) -> dict[any, Histogram]:
+        """
+        Aggregates the histograms by the given fields of CommandKey.
+        The keys are tuples of the field values, or the plain value when grouped by a single field.
+        """
+        self.__name_records()
+        groups: dict[any, Histogram] = {}
+        with self._lock:
+            for key, histogram in self._histograms.items():
+                values = tuple(getattr(key, field) for field in group_by)
+                group_key = values[0] if len(values) == 1 else values
+                group = groups.get(group_key)
+                if group is None:
+                    group = Histogram()
+                    groups[group_key] = group
+                group.merge(histogram)
+        return groups
+
+    def report(self, *group_by: str, limit: int = 10) -> str:
+        """
+        Lists the groups with the highest total duration.
+        """
+        groups = sorted(self.histograms(*group_by).items(), key=lambda item: item[1].total, reverse=True)
+        return "\n".join(f"{key}: {histogram}" for key, histogram in groups[:limit])
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._histograms.clear()
+
+
+def inject_config(binder: inject.Binder):
+    metrics = CommandMetrics()
+    binder.bind(CommandMetrics, metrics)
+    if Property.is_true(Property.PAF_COMMAND_METRICS):
+        binder.bind(WebDriverManagerListener, metrics)
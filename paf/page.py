@@ -1,16 +1,23 @@
-from typing import Type
+import math
+from contextlib import contextmanager
+from typing import Type, ContextManager
 
 import inject
+from selenium.common import WebDriverException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.remote.webdriver import WebDriver
 
 from paf import javascript
-from paf.assertion import StringAssertion, Format
+from paf.assertion import StringAssertion, Format, ObservedSupplier
+from paf.cache import invalidate
 from paf.common import HasName, Locator, Rect
+from paf.control import get_config
+from paf.dom_snapshot import DomSnapshot, dom_snapshot
 from paf.manager import WebDriverManager
+from paf.readiness import ReadinessStrategy
 from paf.request import WebDriverRequest
 from paf.types import PAGE, COMPONENT
-from paf.uielement import DefaultUiElement, UiElement
+from paf.uielement import DefaultUiElement, UiElement, PageObject, prefetch, fill
 
 
 class PageFactory:
@@ -27,8 +34,25 @@ class BasePage(HasName):
 
     def open(self, url: str):
         self._webdriver.get(url)
+        invalidate(self._webdriver)
+        self.wait_until_ready()
         return self
 
+    def wait_until_ready(self, *strategies: ReadinessStrategy) -> bool:
+        """
+        Waits until the given or configured readiness strategies are fulfilled, using a single script call.
+        Returns False if the page didn't get ready in time.
+        """
+        config = get_config()
+        strategies = strategies or config.readiness
+        if not strategies:
+            return True
+
+        try:
+            return javascript.wait_for_readiness(self._webdriver, strategies, math.floor(config.readiness_timeout * 1000))
+        except WebDriverException:
+            return False
+
     def __str__(self):
         return self.name
 
@@ -66,6 +90,25 @@ class BasePage(HasName):
         viewport_origin = window_rect.size - viewport.size
         return Rect(position=window_rect.origin + viewport_origin, size=viewport.size)
 
+    def dom_snapshot(self) -> ContextManager[DomSnapshot]:
+        return dom_snapshot(self._webdriver)
+
+    @contextmanager
+    def prefetch(self, *page_objects: PageObject | Locator) -> ContextManager[list[PageObject]]:
+        """
+        Resolves the given elements within a single browser call, locators are found on this page.
+        """
+        page_objects = [self._find(item) if isinstance(item, Locator) else item for item in page_objects]
+        with prefetch(page_objects):
+            yield page_objects
+
+    def fill(self, values: dict[PageObject | Locator, str]):
+        """
+        Fills and verifies the given form fields within a single script call, locators are found on this page.
+        """
+        fill({self._find(key) if isinstance(key, Locator) else key: value for key, value in values.items()})
+        return self
+
 
 class FinderPage(BasePage):
     def find(self, by: Locator, name: str = None) -> UiElement:
@@ -100,19 +143,21 @@ class PageAssertion:
 
     @property
     def title(self):
+        title = ObservedSupplier(lambda: self._webdriver.title)
         return StringAssertion(
             parent=self._page,
-            actual_supplier=lambda: self._webdriver.title,
-            name_supplier=lambda: f".title {Format.param(self._webdriver.title)} ",
+            actual_supplier=title,
+            name_supplier=lambda: f".title {Format.param(title.value)} ",
             raise_exception=self._raise,
         )
 
     @property
     def url(self):
+        url = ObservedSupplier(lambda: self._webdriver.current_url)
         return StringAssertion(
             parent=self._page,
-            actual_supplier=lambda: self._webdriver.current_url,
-            name_supplier=lambda: f".url {Format.param(self._webdriver.current_url)} ",
+            actual_supplier=url,
+            name_supplier=lambda: f".url {Format.param(url.value)} ",
             raise_exception=self._raise,
         )
 
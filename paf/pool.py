@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+from time import time
+
+from selenium.common import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from paf.request import WebDriverRequest
+
+
+class PooledWebDriver:
+    def __init__(self, webdriver: WebDriver):
+        self.webdriver = webdriver
+        self.released_time = time()
+
+
+class WebDriverPool:
+    def __init__(self, max_size: int = 0, idle_timeout: float = None):
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle: dict[str, list[PooledWebDriver]] = {}
+
+    @property
+    def enabled(self):
+        return self._max_size > 0
+
+    @property
+    def size(self):
+        with self._lock:
+            return self.__size()
+
+    @property
+    def free(self):
+        with self._lock:
+            return max(self._max_size - self.__size(), 0)
+
+    def __size(self):
+        return sum(len(pooled) for pooled in self._idle.values())
+
+    @staticmethod
+    def get_profile(request: WebDriverRequest) -> str:
+        capabilities = {}
+        if request.options:
+            capabilities = request.options.to_capabilities()
+
+        server_url = None
+        if request.server_url:
+            server_url = request.server_url.geturl()
+
+        return json.dumps({
+            "browser": request.browser,
+            "browser_version": request.browser_version,
+            "server_url": server_url,
+            "capabilities": capabilities,
+        }, sort_keys=True, default=str)
+
+    def acquire(self, profile: str) -> WebDriver | None:
+        self.evict_idle()
+        while True:
+            with self._lock:
+                pooled = self._idle.get(profile)
+                if not pooled:
+                    return None
+                webdriver = pooled.pop().webdriver
+
+            if self._is_healthy(webdriver):
+                return webdriver
+
+            self._quit(webdriver)
+
+    def release(self, profile: str, webdriver: WebDriver) -> bool:
+        if self.free == 0:
+            return False
+
+        try:
+            self._reset(webdriver)
+        except Exception as e:
+            logging.warning(f"Unable to reset WebDriver session {webdriver.session_id}: {e}")
+            return False
+
+        if not self.put(profile, webdriver):
+            return False
+        self.evict_idle()
+        return True
+
+    def put(self, profile: str, webdriver: WebDriver) -> bool:
+        with self._lock:
+            if self.__size() >= self._max_size:
+                return False
+            self._idle.setdefault(profile, []).append(PooledWebDriver(webdriver))
+            return True
+
+    def evict_idle(self):
+        if self._idle_timeout is None:
+            return
+
+        evicted = []
+        now = time()
+        with self._lock:
+            for profile, pooled in self._idle.items():
+                expired = [entry for entry in pooled if now - entry.released_time > self._idle_timeout]
+                for entry in expired:
+                    pooled.remove(entry)
+                evicted.extend(expired)
+
+        for entry in evicted:
+            self._quit(entry.webdriver)
+
+    def shutdown(self):
+        with self._lock:
+            pooled = [entry for entries in self._idle.values() for entry in entries]
+            self._idle.clear()
+
+        for entry in pooled:
+            self._quit(entry.webdriver)
+
+    def _is_healthy(self, webdriver: WebDriver):
+        try:
+            return webdriver.execute_script("return document.readyState") is not None
+        except Exception:
+            return False
+
+    def _reset(self, webdriver: WebDriver):
+        handles = webdriver.window_handles
+        for handle in handles[1:]:
+            webdriver.switch_to.window(handle)
+            webdriver.close()
+        webdriver.switch_to.window(handles[0])
+
+        # Storages can only be cleared for the current origin
+        webdriver.execute_script("""try {
+    window.localStorage.clear();
+    window.sessionStorage.clear();
+} catch (e) {}""")
+        if not self._clear_browser_cookies(webdriver):
+            webdriver.delete_all_cookies()
+        webdriver.get("about:blank")
+        webdriver.capabilities.pop("paf:requestName", None)
+
+    def _clear_browser_cookies(self, webdriver: WebDriver) -> bool:
+        # Chromium deletes the cookies of all domains, the WebDriver only the ones of the current domain
+        try:
+            webdriver.execute("executeCdpCommand", {"cmd": "Network.clearBrowserCookies", "params": {}})
+            return True
+        except (KeyError, WebDriverException):
+            return False
+
+    def _quit(self, webdriver: WebDriver):
+        try:
+            webdriver.quit()
+        except Exception as e:
+            logging.warning(f"Unable to quit pooled WebDriver session: {e}")
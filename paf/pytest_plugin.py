@@ -0,0 +1,12 @@
+import pytest
+
+from paf.assertion import unused_assertions
+
+
+@pytest.fixture(autouse=True)
+def flush_unused_assertions():
+    """
+    Reports the unused assertions of every test after it has finished
+    """
+    yield
+    unused_assertions.flush()
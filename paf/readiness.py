@@ -0,0 +1,149 @@
+from abc import ABC, abstractmethod
+
+
+class ReadinessStrategy(ABC):
+    """
+    A condition, evaluated within the browser, that signals a page is ready for interaction.
+    """
+    @property
+    def setup(self) -> str:
+        """
+        Javascript statements, executed once per document before the first evaluation
+        """
+        return ""
+
+    @property
+    @abstractmethod
+    def predicate(self) -> str:  # pragma: no cover
+        """
+        Javascript expression, which is true if the page is ready
+        """
+        pass
+
+    def __str__(self):
+        return self.__class__.__name__
+
+
+class DocumentReady(ReadinessStrategy):
+    @property
+    def predicate(self) -> str:
+        return 'document.readyState === "complete"'
+
+
+class NetworkIdle(ReadinessStrategy):
+    """
+    No fetch or XMLHttpRequest pending and no resources loaded for the given time.
+    Requests started before the first evaluation are only recognized when they finish.
+    """
+    def __init__(self, idle_ms: int = 500):
+        self.idle_ms = idle_ms
+
+    @property
+    def setup(self) -> str:
+        return """if (!window.__pafNetwork) {
+    const network = window.__pafNetwork = {pending: 0, lastActivity: Date.now()};
+    const done = function() {
+        network.pending = Math.max(0, network.pending - 1);
+        network.lastActivity = Date.now();
+    };
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function() {
+            network.pending++;
+            network.lastActivity = Date.now();
+            return fetch.apply(this, arguments).finally(done);
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        network.pending++;
+        network.lastActivity = Date.now();
+        this.addEventListener("loadend", done, {once: true});
+        return send.apply(this, arguments);
+    };
+    if (window.PerformanceObserver) {
+        new PerformanceObserver(function() { network.lastActivity = Date.now(); }).observe({type: "resource"});
+    }
+}"""
+
+    @property
+    def predicate(self) -> str:
+        return f"window.__pafNetwork.pending === 0 && Date.now() - window.__pafNetwork.lastActivity >= {self.idle_ms}"
+
+
+class DomQuiet(ReadinessStrategy):
+    """
+    No mutations of the DOM for the given time.
+    """
+    def __init__(self, quiet_ms: int = 300):
+        self.quiet_ms = quiet_ms
+
+    @property
+    def setup(self) -> str:
+        return """if (!window.__pafDom) {
+    const dom = window.__pafDom = {lastMutation: Date.now()};
+    new MutationObserver(function() { dom.lastMutation = Date.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}"""
+
+    @property
+    def predicate(self) -> str:
+        return f"Date.now() - window.__pafDom.lastMutation >= {self.quiet_ms}"
+
+
+class AngularReady(ReadinessStrategy):
+    """
+    All Angular applications are stable, or AngularJS has no outstanding HTTP requests.
+    Pages without Angular are considered ready.
+    """
+    @property
+    def predicate(self) -> str:
+        return """(function() {
+    if (window.getAllAngularTestabilities) {
+        return window.getAllAngularTestabilities().every(function(testability) { return testability.isStable(); });
+    }
+    if (window.angular && window.angular.element) {
+        const injector = window.angular.element(document.body).injector();
+        return !injector || injector.get("$http").pendingRequests.length === 0;
+    }
+    return true;
+})()"""
+
+
+class ScriptPredicate(ReadinessStrategy):
+    """
+    A custom Javascript expression, like `window.appReady === true`
+    """
+    def __init__(self, expression: str):
+        self.expression = expression
+
+    @property
+    def predicate(self) -> str:
+        return f"({self.expression})"
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self.expression})"
+
+
+_STRATEGIES = {
+    "document": DocumentReady,
+    "network": NetworkIdle,
+    "dom": DomQuiet,
+    "angular": AngularReady,
+}
+
+
+def from_names(names: str | None) -> tuple[ReadinessStrategy, ...]:
+    """
+    Creates the strategies of a comma separated list like "document,network"
+    """
+    if not names:
+        return ()
+
+    strategies = []
+    for name in names.split(","):
+        name = name.strip().lower()
+        if name not in _STRATEGIES:
+            raise ValueError(f"Unknown readiness strategy: {name}, use one of {', '.join(_STRATEGIES)}")
+        strategies.append(_STRATEGIES[name]())
+    return tuple(strategies)
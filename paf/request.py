@@ -30,6 +30,7 @@ class WebDriverRequest:
         self._browser_version: str = None
         self._options: BaseOptions = None
         self._server_url: ParseResult = None
+        self._pooled = False
         server_url = Property.env(Property.PAF_SELENIUM_SERVER_URL)
         if server_url:
             self.server_url = server_url
@@ -53,6 +54,14 @@ class WebDriverRequest:
 
         self._server_url = url
 
+    @property
+    def pooled(self) -> bool:
+        return self._pooled
+
+    @pooled.setter
+    def pooled(self, pooled: bool):
+        self._pooled = pooled
+
     @property
     @deprecated("Use name property instead")
     def session_name(self):
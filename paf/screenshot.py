@@ -0,0 +1,55 @@
+import atexit
+import base64
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+import inject
+
+from paf.common import Property
+
+
+class ScreenshotWriter:
+    def __init__(self, max_queue_size: int = 16):
+        self._queue: queue.Queue[tuple[Path, str, Future]] = queue.Queue(maxsize=max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, base64_png: str) -> Future[Path | None]:
+        self.__start()
+        future = Future()
+        # Blocks when the queue is full, so pending screenshots cannot pile up in memory
+        self._queue.put((path, base64_png, future))
+        return future
+
+    def flush(self):
+        if self._thread is not None:
+            self._queue.join()
+
+    def __start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.__run, name="paf-screenshot-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def __run(self):
+        while True:
+            path, base64_png, future = self._queue.get()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(base64.b64decode(base64_png.encode("ascii")))
+                future.set_result(path)
+            except OSError as e:
+                logging.error(f"Unable to write screenshot {path}: {e}")
+                future.set_result(None)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+
+def inject_config(binder: inject.Binder):
+    binder.bind(ScreenshotWriter, ScreenshotWriter(int(Property.env(Property.PAF_SCREENSHOT_QUEUE_SIZE))))
@@ -0,0 +1,73 @@
+import logging
+import threading
+
+import urllib3
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+try:
+    from selenium.webdriver.remote.webdriver import get_remote_connection
+except ImportError:  # pragma: no cover
+    get_remote_connection = None
+
+
+class RemoteTransport:
+    def __init__(self, max_connections: int = 10, timeout: float = None, http2: bool = False):
+        self._max_connections = max_connections
+        self._timeout = timeout
+        self._http2 = http2
+        self._lock = threading.Lock()
+        self._connection_managers: dict[str | None, urllib3.PoolManager] = {}
+
+    @property
+    def max_connections(self):
+        return self._max_connections
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    def create_connection(self, server_url: str, capabilities: dict) -> RemoteConnection | str:
+        if self._http2:
+            self.__enable_http2()
+
+        # Sharing connections relies on Selenium internals, otherwise Selenium's default executor is used
+        if get_remote_connection is None:
+            return server_url
+
+        # Keeps the browser specific commands of the connection implementations
+        connection = get_remote_connection(capabilities, command_executor=server_url, keep_alive=True)
+        try:
+            connection_manager = self.__get_connection_manager(connection)
+        except AttributeError as e:
+            logging.warning(f"Unable to share connections with other sessions: {e}")
+            return connection
+
+        connection._conn = connection_manager
+        # The connection manager is shared with other sessions and must not be cleared on quit
+        connection.close = lambda: None
+        return connection
+
+    def __get_connection_manager(self, connection: RemoteConnection) -> urllib3.PoolManager:
+        proxy_url = connection._proxy_url
+        with self._lock:
+            connection_manager = self._connection_managers.get(proxy_url)
+            if connection_manager is None:
+                connection_manager = connection._get_connection_manager()
+                connection_manager.connection_pool_kw["maxsize"] = self._max_connections
+                if self._timeout is not None:
+                    connection_manager.connection_pool_kw["timeout"] = urllib3.Timeout(total=self._timeout)
+                self._connection_managers[proxy_url] = connection_manager
+            return connection_manager
+
+    def __enable_http2(self):
+        try:
+            import urllib3.http2
+            urllib3.http2.inject_into_urllib3()
+        except ImportError as e:
+            raise Exception(f"HTTP/2 is not available, install python-automation-framework[http2]: {e}")
+
+    def clear(self):
+        with self._lock:
+            for connection_manager in self._connection_managers.values():
+                connection_manager.clear()
+            self._connection_managers.clear()
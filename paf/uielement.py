@@ -1,14 +1,16 @@
+import logging
 import math
 import time
 from abc import abstractmethod, ABC
+from concurrent.futures import Future
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Type, TypeVar, List, Generic, Iterable, Iterator, ContextManager
+from typing import Type, TypeVar, List, Generic, Iterable, Iterator, ContextManager, Callable
 
 import inject
 from is_empty import empty
-from selenium.common import NoSuchShadowRootException
+from selenium.common import NoSuchShadowRootException, WebDriverException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By as SeleniumBy
 from selenium.webdriver.remote.shadowroot import ShadowRoot
@@ -16,14 +18,19 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.color import Color
 
+import paf.dom_snapshot
 import paf.javascript as script
-from paf.assertion import StringAssertion, Format, BinaryAssertion, QuantityAssertion, RectAssertion, ASSERTION
+from paf.assertion import StringAssertion, Format, BinaryAssertion, QuantityAssertion, RectAssertion, ASSERTION, \
+    SnapshotAssertion, ObservedSupplier
+from paf.cache import SessionCache, CachedContext, get_cache, invalidate
 from paf.common import HasParent, Locator, Point, Rect, Property, Formatter, NotFoundException, NotUniqueException, \
     WebdriverRetainer, SubjectException
 from paf.control import retry, get_config
 from paf.dom import Attribute
 from paf.listener import ActionListener
 from paf.locator import By
+from paf.metrics import command_origin
+from paf.screenshot import ScreenshotWriter
 from paf.types import Mapper, Consumer
 from paf.xpath import XPath
 
@@ -110,6 +117,10 @@ class PageObject(Generic[T]):
     def take_screenshot(self, file_name: str = None) -> Path | None:  # pragma: no cover
         pass
 
+    @abstractmethod
+    def capture_screenshot(self, file_name: str = None) -> Future[Path | None]:  # pragma: no cover
+        pass
+
 
 class UiElementTests:
     @property
@@ -185,9 +196,36 @@ class UiElement(
                 raise NotFoundException()
 
     def _count_elements(self):
+        elements = self._find_in_dom_snapshot()
+        if elements is not None:
+            return len(elements)
+
+        count = self._count_by_script()
+        if count is not None:
+            return count
+
         with self._find_web_elements() as web_elements:
             return len(web_elements)
 
+    def collect(self, text: bool = False, attributes: Iterable[str | Attribute] = ()) -> List[dict]:
+        attributes = [attribute.value if isinstance(attribute, Attribute) else attribute for attribute in attributes]
+        with self._find_web_elements() as web_elements:
+            if len(web_elements) == 0:
+                return []
+            return script.collect(self.webdriver, web_elements, text, attributes)
+
+    def _wait_for_condition(self, condition: dict, timeout: float) -> bool:
+        return False
+
+    def _find_in_dom_snapshot(self) -> list | None:
+        return None
+
+    def _count_by_script(self) -> int | None:
+        return None
+
+    def dom_snapshot(self) -> ContextManager["paf.dom_snapshot.DomSnapshot"]:
+        return paf.dom_snapshot.dom_snapshot(self.webdriver)
+
 
 class TestableUiElement(PageObject["TestableUiElement"], UiElementTests, ABC):
     pass
@@ -243,6 +281,11 @@ class InexistentUiElement(AbstractUiElement):
     def take_screenshot(self, file_name: str = None) -> Path | None:
         pass
 
+    def capture_screenshot(self, file_name: str = None) -> Future[Path | None]:
+        future = Future()
+        future.set_result(None)
+        return future
+
     def click(self):
         pass
 
@@ -287,6 +330,16 @@ class InexistentUiElement(AbstractUiElement):
         yield []
 
 
+_SCRIPT_LOCATORS = (
+    SeleniumBy.ID,
+    SeleniumBy.XPATH,
+    SeleniumBy.NAME,
+    SeleniumBy.TAG_NAME,
+    SeleniumBy.CLASS_NAME,
+    SeleniumBy.CSS_SELECTOR,
+)
+
+
 class DefaultUiElement(AbstractUiElement):
     def __init__(
             self,
@@ -307,8 +360,6 @@ class DefaultUiElement(AbstractUiElement):
         self._ui_element = ui_element
         self.__by = by
         self.__index = index
-        self.__web_element_id = None
-        self.__has_shadow_root = None
         super().__init__(name, parent)
 
     @property
@@ -338,57 +389,384 @@ class DefaultUiElement(AbstractUiElement):
         else:
             return by.value
 
-    def _filter_web_elements(self, web_elements: List[WebElement]):
+    def _filter_web_elements(self, web_elements: List[WebElement], conditions_applied: bool = False):
+        conditions = self._by.get_conditions()
+        if conditions and not conditions_applied and len(web_elements) > 0:
+            web_elements = script.filter_elements(self._webdriver, web_elements, list(conditions))
+
         if self._by.get_filter():
             return list(filter(self._by.get_filter(), web_elements))
         else:
             return web_elements
 
-    def __detect_shadow_root(self, ui_element: "DefaultUiElement", web_element: WebElement) -> WebElement|ShadowRoot:
-        if ui_element.__web_element_id != web_element.id:
-            ui_element.__web_element_id = web_element.id
+    def __detect_shadow_root(self, web_element: WebElement) -> WebElement|ShadowRoot:
+        session_cache = self.__get_session_cache()
+        has_shadow_root = session_cache.has_shadow_root(web_element.id)
+        if has_shadow_root is None:
             try:
                 web_element_context = web_element.shadow_root
-                ui_element.__has_shadow_root = True
+                session_cache.set_shadow_root(web_element.id, True)
                 return web_element_context
             except NoSuchShadowRootException as e:
-                ui_element.__has_shadow_root = False
+                session_cache.set_shadow_root(web_element.id, False)
                 return web_element
-        elif ui_element.__has_shadow_root:
+        elif has_shadow_root:
             return web_element.shadow_root
         else:
             return web_element
 
-    @contextmanager
-    def _find_web_elements(self) -> ContextManager[List[WebElement]]:
+    @property
+    def _chain_key(self) -> tuple | None:
+        conditions = tuple(tuple(sorted(condition.items())) for condition in self.__by.get_conditions())
+        key = (self.__by.by, self.__by.value, self.__by.is_unique, self.__by.get_filter(), conditions, self.__index)
+        if not self._ui_element:
+            return key,
+        elif isinstance(self._ui_element, DefaultUiElement):
+            parent_key = self._ui_element._chain_key
+            if parent_key is not None:
+                return parent_key + (key,)
+        return None
+
+    def __script_step(self) -> dict | None:
+        if self._by.by not in _SCRIPT_LOCATORS:
+            return None
+
+        value = self._by.value
         if self._ui_element:
+            value = self.__relative_selector(self._by)
+
+        return {
+            "by": self._by.by,
+            "value": value,
+            "index": self._index,
+            "unique": self._by.is_unique,
+            "shadow": self._by.has_shadow_root,
+            "conditions": list(self._by.get_conditions()),
+        }
+
+    @property
+    def _script_chain(self) -> list[dict] | None:
+        step = self.__script_step()
+        if step is None:
+            return None
+        elif not self._ui_element:
+            return [step]
+        # Python filters of parent elements cannot be applied within the browser
+        elif isinstance(self._ui_element, DefaultUiElement) and not self._ui_element._by.get_filter():
+            parent_chain = self._ui_element._script_chain
+            if parent_chain is not None:
+                return parent_chain + [step]
+        return None
+
+    def __get_session_cache(self) -> SessionCache | None:
+        if self._webdriver is None:
+            return None
+        return get_cache(self._webdriver)
+
+    def __switch_to_default_content(self):
+        # User code may have switched the frame, which cannot be detected without a command
+        self._webdriver.switch_to.default_content()
+        session_cache = self.__get_session_cache()
+        if session_cache:
+            session_cache.frame_path = ()
+
+    def __switch_to_frame(self, web_element: WebElement):
+        self._webdriver.switch_to.frame(web_element)
+        session_cache = self.__get_session_cache()
+        if session_cache and session_cache.frame_path is not None:
+            session_cache.frame_path += (web_element,)
+
+    def __switch_to_frame_path(self, frame_path: tuple[WebElement, ...]):
+        # Cached frames don't need to be looked up again, but are switched to from the default content
+        self.__switch_to_default_content()
+        for frame in frame_path:
+            self.__switch_to_frame(frame)
+
+    def __create_context(self, web_element: WebElement) -> CachedContext:
+        session_cache = self.__get_session_cache()
+        frame_path = session_cache.frame_path if session_cache else None
+        # Shadow hosts cannot be frames
+        if self._ui_element._by.has_shadow_root:
+            return CachedContext(web_element, web_element.shadow_root, False, frame_path)
+        elif web_element.tag_name.lower() in ("frame", "iframe"):
+            return CachedContext(web_element, web_element, True, frame_path)
+        else:
+            return CachedContext(web_element, self.__detect_shadow_root(web_element), False, frame_path)
+
+    def __find_in_context(self, context: CachedContext) -> List[WebElement]:
+        if context.is_frame:
+            self.__switch_to_frame(context.web_element)
+            return self._webdriver.find_elements(self._by.by, self._by.value)
+        else:
+            return context.context.find_elements(self._by.by, self.__relative_selector(self._by))
+
+    def __find_in_cached_context(self, context: CachedContext) -> List[WebElement]:
+        if context.is_frame:
+            self.__switch_to_frame_path(context.frame_path + (context.web_element,))
+            return self._webdriver.find_elements(self._by.by, self._by.value)
+        else:
+            self.__switch_to_frame_path(context.frame_path)
+            return context.context.find_elements(self._by.by, self.__relative_selector(self._by))
+
+    def __find_by_script(self, session_cache: SessionCache, parent_key: tuple) -> dict | None:
+        chain = self._script_chain
+        if chain is None or session_cache.is_script_fallback(parent_key):
+            return None
+
+        self.__switch_to_default_content()
+        result = script.find_elements_by_chain(self._webdriver, chain)
+        if result.get("frame"):
+            session_cache.add_script_fallback(parent_key)
+
+        return result
+
+    def __find_in_parent(self) -> tuple[List[WebElement], bool]:
+        config = get_config()
+        session_cache = None
+        parent_key = None
+        if isinstance(self._ui_element, DefaultUiElement):
+            session_cache = self.__get_session_cache()
+            parent_key = self._ui_element._chain_key
+
+        if session_cache is None or parent_key is None:
             with self._ui_element.find_web_element() as web_element:
-                is_frame = web_element.tag_name.lower() in ("frame", "iframe")
-                if is_frame:
-                    self._webdriver.switch_to.frame(web_element)
-                    web_elements = self._webdriver.find_elements(self._by.by, self._by.value)
-                else:
-                    web_element = self.__detect_shadow_root(self._ui_element, web_element)
-                    web_elements = web_element.find_elements(self._by.by, self.__relative_selector(self._by))
+                return self.__find_in_context(self.__create_context(web_element)), False
+
+        cached_context = None
+        if config.element_cache:
+            cached_context = session_cache.get_context(parent_key)
+            if cached_context:
+                try:
+                    web_elements = self.__find_in_cached_context(cached_context)
+                    if len(web_elements) > 0:
+                        return web_elements, False
+                except WebDriverException:
+                    pass
+                # The cached parent may be stale or replaced, so resolve it again
+                session_cache.remove_context(parent_key)
+
+        script_result = None
+        if config.script_resolution and not cached_context:
+            script_result = self.__find_by_script(session_cache, parent_key)
+            if script_result is not None and not script_result.get("fallback"):
+                # The script already applied the conditions of this element
+                return script_result["elements"], True
+
+        with self._ui_element.find_web_element() as web_element:
+            context = self.__create_context(web_element)
+            if config.element_cache:
+                session_cache.put_context(parent_key, context)
+            web_elements = self.__find_in_context(context)
+
+        # Closed shadow roots are not accessible by script
+        if script_result is not None and len(web_elements) > 0:
+            session_cache.add_script_fallback(parent_key)
+
+        return web_elements, False
 
-                yield self._filter_web_elements(web_elements)
+    @contextmanager
+    def _find_web_elements(self) -> ContextManager[List[WebElement]]:
+        if self._ui_element:
+            web_elements, conditions_applied = self.__find_in_parent()
+            yield self._filter_web_elements(web_elements, conditions_applied)
 
         elif self._webdriver:
-            self._webdriver.switch_to.default_content()
+            self.__switch_to_default_content()
             web_elements = self._webdriver.find_elements(self._by.by, self._by.value)
             yield self._filter_web_elements(web_elements)
         else:
             raise Exception(f"{self.name_path} initialized without WebDriver nor UiElement")
 
+    def _wait_for_condition(self, condition: dict, timeout: float) -> bool:
+        chain = self._script_chain
+        # Python filters cannot be applied within the browser
+        if chain is None or self._by.get_filter() or timeout <= 0:
+            return False
+
+        session_cache = self.__get_session_cache()
+        parent_key = self._ui_element._chain_key if self._ui_element else None
+        # Chains crossing frames are resolved element wise
+        if session_cache is not None and parent_key is not None:
+            if session_cache.is_script_fallback(parent_key):
+                return False
+            cached_context = session_cache.get_context(parent_key)
+            if cached_context is not None and cached_context.frame_path:
+                return False
+
+        try:
+            self.__switch_to_default_content()
+            result = script.wait_for_condition(self._webdriver, chain, condition, math.floor(timeout * 1000))
+        except WebDriverException:
+            return False
+
+        if result.get("frame") and session_cache is not None:
+            session_cache.add_script_fallback(parent_key)
+        return result.get("satisfied") is True
+
+    def __query_by_script(self, query: Callable[[WebDriver, list[dict]], dict]) -> dict | None:
+        if not get_config().script_resolution or self._by.get_filter():
+            return None
+
+        session_cache = self.__get_session_cache()
+        chain = self._script_chain
+        if session_cache is None or chain is None:
+            return None
+
+        parent_key = self._ui_element._chain_key if self._ui_element else None
+        if parent_key is not None and session_cache.is_script_fallback(parent_key):
+            return None
+
+        self.__switch_to_default_content()
+        result = query(self._webdriver, chain)
+        if result.get("frame"):
+            session_cache.add_script_fallback(parent_key)
+        return result
+
+    def _count_by_script(self) -> int | None:
+        # Counts within the browser instead of transferring all element references
+        result = self.__query_by_script(script.count_elements_by_chain)
+        # Frames, closed shadow roots and unsupported locators are resolved element wise
+        if result is None or result.get("fallback"):
+            return None
+        return result["count"]
+
+    def __select_by_script(self) -> WebElement | None:
+        # Selects the indexed element within the browser instead of transferring all element references
+        result = self.__query_by_script(script.select_element_by_chain)
+        if result is None or result.get("fallback"):
+            return None
+        elif result.get("element") is not None:
+            return result["element"]
+        elif self._by.is_unique and result["count"] != 1:
+            raise NotUniqueException()
+        else:
+            raise NotFoundException()
+
+    def _find_in_dom_snapshot(self) -> list | None:
+        session_cache = self.__get_session_cache()
+        if session_cache is None or session_cache.dom_snapshot is None:
+            return None
+
+        chain = self._script_chain
+        # Python filters cannot be applied to the snapshot
+        if chain is None or self._by.get_filter():
+            return None
+
+        return session_cache.dom_snapshot.find_chain(chain, self._chain_key)
+
+    @staticmethod
+    def _prefetch(ui_elements: List["DefaultUiElement"]) -> dict[tuple, WebElement]:
+        chains: dict[tuple, tuple[DefaultUiElement, list[dict]]] = {}
+        for ui_element in ui_elements:
+            chain = ui_element._script_chain
+            chain_key = ui_element._chain_key
+            # Python filters cannot be applied within the browser
+            if chain is not None and chain_key is not None and not ui_element._by.get_filter():
+                chains.setdefault(chain_key, (ui_element, chain))
+
+        if len(chains) == 0:
+            return {}
+
+        first = next(iter(chains.values()))[0]
+        session_cache = first.__get_session_cache()
+        first.__switch_to_default_content()
+        results = script.find_elements_by_chains(first._webdriver, [chain for _, chain in chains.values()])
+
+        # Pins the elements like find_web_element() would resolve them
+        pinned_elements = {}
+        for (chain_key, (ui_element, _)), result in zip(chains.items(), results):
+            web_elements = result.get("elements")
+            if not web_elements or (ui_element._by.is_unique and len(web_elements) != 1):
+                continue
+            if len(web_elements) > ui_element._index:
+                pinned_elements[chain_key] = web_elements[ui_element._index]
+
+        session_cache.pin_elements(pinned_elements)
+        return pinned_elements
+
+    @staticmethod
+    def _fill(fields: List[tuple["DefaultUiElement", str]]) -> List[tuple["DefaultUiElement", str]]:
+        batch = []
+        remaining = []
+        for ui_element, value in fields:
+            chain = ui_element._script_chain
+            # Python filters cannot be applied within the browser
+            if chain is None or ui_element._by.get_filter():
+                remaining.append((ui_element, value))
+            else:
+                batch.append((ui_element, value, chain))
+
+        if len(batch) == 0:
+            return remaining
+
+        first = batch[0][0]
+        session_cache = first.__get_session_cache()
+        action_listener = inject.instance(ActionListener)
+        unresolved = []
+        failed = []
+
+        def _sequence():
+            unresolved.clear()
+            # All fields fail until the results are verified
+            failed[:] = [ui_element for ui_element, _, _ in batch]
+            first.__switch_to_default_content()
+            results = script.fill_by_chains(
+                first._webdriver,
+                [{"chain": chain, "value": value} for _, value, chain in batch],
+            )
+            session_cache.clear_pinned_elements()
+            session_cache.dom_snapshot = None
+
+            failed.clear()
+            mismatches = []
+            for (ui_element, value, _), result in zip(batch, results):
+                if "value" not in result:
+                    unresolved.append((ui_element, value))
+                elif result["value"] != value:
+                    failed.append(ui_element)
+                    mismatches.append(f"{ui_element.name_path}.value {Format.param(result['value'])} to be {Format.param(value)}")
+            if mismatches:
+                raise AssertionError(f"Expected {', '.join(mismatches)}")
+
+        def _on_fail(e: Exception):
+            invalidate(first._webdriver)
+            for ui_element in failed:
+                action_listener.action_failed("fill", ui_element, e)
+
+        try:
+            with command_origin(first, "fill"):
+                retry(_sequence, _on_fail)
+        except SubjectException as exception:
+            exception.add_subject(", ".join(ui_element.name_path for ui_element in failed))
+            for ui_element in failed:
+                action_listener.action_failed_finally("fill", ui_element, exception)
+            raise exception
+
+        for ui_element, value, _ in batch:
+            if (ui_element, value) not in unresolved:
+                action_listener.action_passed("fill", ui_element)
+
+        return remaining + unresolved
+
     def __web_element_action_sequence(self, action: Consumer[WebElement], action_name: str):
         action_listener = inject.instance(ActionListener)
 
         def _sequence():
             with self.find_web_element() as web_element:
                 action(web_element)
+            # Actions may change the DOM, so the elements need to be resolved again
+            session_cache = self.__get_session_cache()
+            if session_cache:
+                session_cache.clear_pinned_elements()
+                session_cache.dom_snapshot = None
+
+        def _on_fail(e: Exception):
+            invalidate(self._webdriver)
+            action_listener.action_failed(action_name, self, e)
 
         try:
-            retry(_sequence, lambda e: action_listener.action_failed(action_name, self, e))
+            with command_origin(self, action_name):
+                retry(_sequence, _on_fail)
             action_listener.action_passed(action_name, self)
         except SubjectException as exception:
             exception.add_subject(self.name_path)
@@ -396,18 +774,17 @@ class DefaultUiElement(AbstractUiElement):
             raise exception
 
     def take_screenshot(self, file_name: str = None) -> Path | None:
+        return self.capture_screenshot(file_name).result()
+
+    def capture_screenshot(self, file_name: str = None) -> Future[Path | None]:
         with self.find_web_element() as web_element:
             dir = Path(Property.env(Property.PAF_SCREENSHOTS_DIR))
             if empty(file_name):
                 formatter = inject.instance(Formatter)
                 file_name = f"{self.webdriver.session_id}-{self.name}-{formatter.datetime(datetime.now())}.png"
 
-            dir.mkdir(parents=True, exist_ok=True)
-            path = dir / file_name
-            if web_element.screenshot(str(path)):
-                return path
-            else:
-                return None
+            screenshot = web_element.screenshot_as_base64
+            return inject.instance(ScreenshotWriter).write(dir / file_name, screenshot)
 
     def __send_keys(self, web_element: WebElement, value: str):
         config = get_config()
@@ -444,6 +821,13 @@ class DefaultUiElement(AbstractUiElement):
 
     def type(self, value: str):
         def _action(web_element: WebElement):
+            if get_config().fast_fill:
+                actual = script.set_value(self._webdriver, web_element, value)
+                # Fields like file inputs require key events
+                if actual is not None:
+                    assert actual == value
+                    return
+
             web_element.clear()
             self.__send_keys(web_element, value)
             assert web_element.get_attribute("value") == value
@@ -513,9 +897,56 @@ class DefaultUiElement(AbstractUiElement):
 
         self.__web_element_action_sequence(_action, "highlight")
 
+    def __has_cached_parent(self, session_cache: SessionCache | None) -> bool:
+        if session_cache is None or not get_config().element_cache or not isinstance(self._ui_element, DefaultUiElement):
+            return False
+        parent_key = self._ui_element._chain_key
+        return parent_key is not None and session_cache.get_context(parent_key) is not None
+
+    @contextmanager
+    def find_web_element(self) -> ContextManager[WebElement]:
+        session_cache = self.__get_session_cache()
+        chain_key = self._chain_key
+        web_element = None
+        if session_cache and chain_key is not None and not session_cache.in_frame:
+            web_element = session_cache.get_pinned_element(chain_key)
+
+        # A cached parent resolves this element with one lookup, so the script is only used without it
+        if web_element is None and not self.__has_cached_parent(session_cache):
+            web_element = self.__select_by_script()
+
+        if web_element is not None:
+            yield web_element
+        else:
+            with super().find_web_element() as web_element:
+                yield web_element
+
     def __iter__(self):
-        for i in range(self._count_elements()):
-            yield self.__getitem__(i)
+        with self._find_web_elements() as web_elements:
+            items = [self.__getitem__(i) for i in range(len(web_elements))]
+            pinned_elements = self.__pin_web_elements(items, web_elements)
+
+        try:
+            for item in items:
+                yield item
+        finally:
+            if pinned_elements:
+                self.__get_session_cache().unpin_elements(pinned_elements)
+
+    def __pin_web_elements(self, items: List["DefaultUiElement"], web_elements: List[WebElement]) -> dict[tuple, WebElement]:
+        session_cache = self.__get_session_cache()
+        if not get_config().element_cache or session_cache is None or self._by.is_unique:
+            return {}
+
+        # Pins the items to their resolved elements within the iteration, or until the next action or failure
+        pinned_elements = {}
+        for item, web_element in zip(items, web_elements):
+            chain_key = item._chain_key
+            if chain_key is None:
+                return {}
+            pinned_elements[chain_key] = web_element
+        session_cache.pin_elements(pinned_elements)
+        return pinned_elements
 
     def __getitem__(self, index: int):
         return DefaultUiElement(
@@ -527,6 +958,59 @@ class DefaultUiElement(AbstractUiElement):
         )
 
 
+@contextmanager
+def prefetch(page_objects: Iterable[PageObject]) -> ContextManager[int]:
+    """
+    Resolves the given elements of one or more sessions with a single script call per session.
+    The elements are pinned to the resolved ones within this scope, or until the next action or failure.
+    Yields the amount of resolved elements.
+    """
+    config = get_config()
+    if not config.element_cache or not config.script_resolution:
+        logging.warning("Prefetching requires element_cache and script_resolution, elements are resolved as usual")
+        yield 0
+        return
+
+    sessions: dict[WebDriver, list[DefaultUiElement]] = {}
+    for page_object in page_objects:
+        # Components wrap their UiElement
+        ui_element = page_object if isinstance(page_object, UiElement) else page_object._ui_element
+        if isinstance(ui_element, DefaultUiElement) and ui_element.webdriver is not None:
+            sessions.setdefault(ui_element.webdriver, []).append(ui_element)
+
+    pinned_elements: dict[WebDriver, dict[tuple, WebElement]] = {}
+    try:
+        for webdriver, ui_elements in sessions.items():
+            with command_origin(ui_elements[0], "prefetch"):
+                pinned_elements[webdriver] = DefaultUiElement._prefetch(ui_elements)
+        yield sum(len(elements) for elements in pinned_elements.values())
+    finally:
+        for webdriver, elements in pinned_elements.items():
+            get_cache(webdriver).unpin_elements(elements)
+
+
+def fill(values: dict[PageObject, str]):
+    """
+    Fills and verifies the given form fields with a single script call per session.
+    Fields which cannot be filled by script, like within frames, are typed afterwards.
+    """
+    sessions: dict[WebDriver, list[tuple[DefaultUiElement, str]]] = {}
+    remaining = []
+    for page_object, value in values.items():
+        # Components wrap their UiElement
+        ui_element = page_object if isinstance(page_object, UiElement) else page_object._ui_element
+        if get_config().script_resolution and isinstance(ui_element, DefaultUiElement) and ui_element.webdriver is not None:
+            sessions.setdefault(ui_element.webdriver, []).append((ui_element, value))
+        else:
+            remaining.append((ui_element, value))
+
+    for fields in sessions.values():
+        remaining.extend(DefaultUiElement._fill(fields))
+
+    for ui_element, value in remaining:
+        ui_element.type(value)
+
+
 class UiElementAssertion:
 
     def __init__(
@@ -541,43 +1025,84 @@ class UiElementAssertion:
             self,
             assertion_class: Type[ASSERTION],
             mapper: Mapper[WebElement, any],
-            property_name: str
+            property_name: str,
+            browser_property: dict = None,
+            snapshot_mapper: Mapper[any, any] = None,
     ) -> ASSERTION:
 
-        def _map_failsafe():
-            try:
-                with self._ui_element.find_web_element() as web_element:
-                    return mapper(web_element)
-            except Exception:
-                return None
-
         def _map():
+            if snapshot_mapper:
+                element = self.__find_in_dom_snapshot()
+                if element is not None:
+                    try:
+                        return snapshot_mapper(element)
+                    except paf.dom_snapshot.NotEvaluableException:
+                        pass
+
             with self._ui_element.find_web_element() as web_element:
                 return mapper(web_element)
 
+        # Names the assertion by the last observed value, instead of looking up the element again
+        actual = ObservedSupplier(_map)
+
         return assertion_class(
             parent=self._ui_element,
-            actual_supplier=_map,
-            name_supplier=lambda: f".{property_name} {Format.param(_map_failsafe())}",
+            actual_supplier=actual,
+            name_supplier=lambda: f".{property_name} {Format.param(actual.value)}",
             raise_exception=self._raise,
+            browser_property=browser_property,
         )
 
+    def __find_in_dom_snapshot(self):
+        elements = self._ui_element._find_in_dom_snapshot()
+        if elements is None:
+            return None
+        # Elements not found in the snapshot are looked up live, which fails properly
+        return paf.dom_snapshot.select(elements, self._ui_element._by.is_unique, self._ui_element._index)
+
     @property
     def text(self):
-        return self._map_web_element_property(StringAssertion, lambda x: x.text, "text")
+        return self._map_web_element_property(
+            StringAssertion,
+            lambda x: x.text,
+            "text",
+            {"property": "text"},
+            paf.dom_snapshot.text,
+        )
 
     def displayed(self, expected: bool):
-        return self._map_web_element_property(BinaryAssertion, lambda x: x.is_displayed(), "displayed").be(expected)
+        return self._map_web_element_property(
+            BinaryAssertion,
+            lambda x: x.is_displayed(),
+            "displayed",
+            {"property": "displayed"},
+            paf.dom_snapshot.displayed,
+        ).be(expected)
 
     def enabled(self, expected: bool):
-        return self._map_web_element_property(BinaryAssertion, lambda x: x.is_enabled(), "enabled").be(expected)
+        return self._map_web_element_property(
+            BinaryAssertion,
+            lambda x: x.is_enabled(),
+            "enabled",
+            snapshot_mapper=paf.dom_snapshot.enabled,
+        ).be(expected)
 
     def selected(self, expected: bool):
-        return self._map_web_element_property(BinaryAssertion, lambda x: x.is_selected(), "selected").be(expected)
+        return self._map_web_element_property(
+            BinaryAssertion,
+            lambda x: x.is_selected(),
+            "selected",
+            snapshot_mapper=paf.dom_snapshot.selected,
+        ).be(expected)
 
     @property
     def tag_name(self):
-        return self._map_web_element_property(StringAssertion, lambda x: x.tag_name, "tag name")
+        return self._map_web_element_property(
+            StringAssertion,
+            lambda x: x.tag_name,
+            "tag name",
+            snapshot_mapper=paf.dom_snapshot.tag_name,
+        )
 
     def attribute(self, attribute: str | Attribute):
         if isinstance(attribute, Attribute):
@@ -586,7 +1111,9 @@ class UiElementAssertion:
         return self._map_web_element_property(
             StringAssertion,
             lambda x: x.get_attribute(attribute),
-            f"attribute({attribute})"
+            f"attribute({attribute})",
+            {"property": "attribute", "name": attribute},
+            lambda x: paf.dom_snapshot.attribute(x, attribute),
         )
 
     def css(self, property_name: str):
@@ -607,8 +1134,7 @@ class UiElementAssertion:
 
     def _visible(self, expected: bool, fully: bool = False):
         def _map(web_element: WebElement):
-            viewport = script.get_viewport(self._ui_element.webdriver)
-            bounds = Rect.from_rect_dict(web_element.rect)
+            bounds, viewport = script.get_bounds(self._ui_element.webdriver, web_element)
             if fully:
                 return viewport.contains(bounds)
             else:
@@ -620,17 +1146,29 @@ class UiElementAssertion:
 
         return self._map_web_element_property(BinaryAssertion, _map, name).be(expected)
 
+    def snapshot(self, attributes: Iterable[str | Attribute] = (), css: Iterable[str] = ()):
+        attributes = [attribute.value if isinstance(attribute, Attribute) else attribute for attribute in attributes]
+        css = list(css)
+
+        return self._map_web_element_property(
+            SnapshotAssertion,
+            lambda web_element: script.get_snapshot(self._ui_element.webdriver, web_element, attributes, css),
+            "snapshot"
+        )
+
     @property
     def value(self):
         return self.attribute("value")
 
     @property
     def count(self):
+        count = ObservedSupplier(self._ui_element._count_elements)
         return QuantityAssertion[int](
             parent=self._ui_element,
-            actual_supplier=self._ui_element._count_elements,
-            name_supplier=lambda: f" count {Format.param(self._ui_element._count_elements())}",
+            actual_supplier=count,
+            name_supplier=lambda: f" count {Format.param(count.value)}",
             raise_exception=self._raise,
+            browser_property={"property": "count"},
         )
 
     @property
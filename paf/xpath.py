@@ -1,10 +1,17 @@
+import copy
 import re
+import weakref
+from functools import lru_cache
 from typing import List, Iterable
 
 from paf.dom import Attribute
 from paf.locator import By
 
 
+# Built XPath trees by expression, so that identical locators share one expression string
+_interned: "weakref.WeakValueDictionary[str, XPath]" = weakref.WeakValueDictionary()
+
+
 class XPath:
 
     def __init__(self, selector: str, position: int = None):
@@ -17,6 +24,7 @@ class XPath:
         self._sub: XPath = None
         self._encloses: List[XPath] = []
         self._attributes: List[str] = []
+        self._built: str | None = None
 
     class Test:
         def __init__(self, xpath: "XPath", attribute: str):
@@ -24,41 +32,54 @@ class XPath:
             self._attribute = attribute
 
         def be(self, value: any):
-            self._attribute_is(self._attribute, value)
-            return self._xpath
+            return self._attribute_is(self._attribute, value)
 
         @property
         def present(self):
-            self._xpath._attributes.append(self._attribute)
-            return self._xpath
+            xpath = self._xpath._mutable()
+            xpath._attributes.append(self._attribute)
+            return xpath
 
         def contains(self, value: any):
-            self._attribute_matches("contains", self._attribute, value)
-            return self._xpath
+            return self._attribute_matches("contains", self._attribute, value)
 
         def has_words(self, *words: any):
             # if not isinstance(words, Iterable):
             #     words = [words]
-            self._attribute_contains_words(self._attribute, words)
-            return self._xpath
+            return self._attribute_contains_words(self._attribute, words)
 
         def starts_with(self, value: any):
-            self._attribute_matches("starts-with", self._attribute, value)
-            return self._xpath
+            return self._attribute_matches("starts-with", self._attribute, value)
 
         def ends_with(self, value: any):
-            self._attribute_matches("ends-with", self._attribute, value)
-            return self._xpath
+            return self._attribute_matches("ends-with", self._attribute, value)
 
         def _attribute_is(self, attribute: str, value: any):
-            self._xpath._attributes.append(XPath._something_is(attribute, value))
+            xpath = self._xpath._mutable()
+            xpath._attributes.append(XPath._something_is(attribute, value))
+            return xpath
 
         def _attribute_matches(self, operation: str, attribute: str, value: any):
-            self._xpath._attributes.append(XPath._something_matches(operation, attribute, value))
+            xpath = self._xpath._mutable()
+            xpath._attributes.append(XPath._something_matches(operation, attribute, value))
+            return xpath
 
         def _attribute_contains_words(self, attribute: str, value: Iterable[any]):
+            xpath = self._xpath._mutable()
             for word in value:
-                self._xpath._attributes.append(XPath._something_contains_word(attribute, word))
+                xpath._attributes.append(XPath._something_contains_word(attribute, word))
+            return xpath
+
+    def _mutable(self) -> "XPath":
+        # A built tree is immutable, so that its expression and hash never change.
+        # Further building continues on a copy of the tree.
+        if self._root is None or self._root._built is None:
+            return self
+
+        memo = {}
+        root = copy.deepcopy(self._root, memo)
+        root._built = None
+        return memo[id(self)]
 
     @staticmethod
     def _normalize_selector(selector: any) -> str:
@@ -81,8 +102,9 @@ class XPath:
     def select(self, selector: any, position: int = None):
         selector = XPath._normalize_selector(selector)
         xpath = XPath(XPath._translate_sub_selection(selector), position)
-        xpath._root = self._root
-        self._parent._sub = xpath
+        parent = self._mutable()
+        xpath._root = parent._root
+        parent._parent._sub = xpath
         xpath._parent = xpath
         return xpath
 
@@ -99,9 +121,10 @@ class XPath:
     def encloses(self, selector: any, position: int = None):
         selector = XPath._normalize_selector(selector)
         xpath = XPath(XPath._translate_inner_selection(selector), position)
-        xpath._root = self._root
-        xpath._parent = self._parent
-        self._encloses.append(xpath)
+        parent = self._mutable()
+        xpath._root = parent._root
+        xpath._parent = parent._parent
+        parent._encloses.append(xpath)
         return xpath
 
     @staticmethod
@@ -131,6 +154,7 @@ class XPath:
         return XPath.Test(self, ".//text()")
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _translate_sub_selection(selector: str):
         if selector.startswith("("):
             return selector
@@ -142,6 +166,7 @@ class XPath:
         return selector
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _translate_inner_selection(selector: str):
         if selector.startswith("//"):
             return re.sub("^//", "descendant::", selector)
@@ -153,6 +178,7 @@ class XPath:
             return f"descendant::{selector}"
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _translate_sibling(selector: str):
         select_type = ""
         if selector.startswith("//"):
@@ -198,5 +224,19 @@ class XPath:
 
         return xpath
 
+    def _freeze(self) -> "XPath":
+        root = self._root
+        if root._built is None:
+            built = root._build()
+            interned = _interned.setdefault(built, root)
+            root._built = interned._built if interned is not root else built
+        return root
+
     def __str__(self):
-        return self._root._build()
+        return self._freeze()._built
+
+    def __eq__(self, other):
+        return isinstance(other, XPath) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
@@ -17,7 +17,15 @@ setup(
     url="https://github.com/mreiche/python-automation-framework",
     author="Mike Reiche",
     packages=["paf"],
-    install_requires=["inject>=4.3.1", "selenium>=4.23.1", "is-empty>=1.0.1"],
+    install_requires=["inject>=4.3.1", "selenium>=4.23.1,<5", "is-empty>=1.0.1"],
+    extras_require={
+        "http2": ["urllib3[h2]>=2.3"],
+        "snapshot": ["lxml>=4.9", "cssselect>=1.2"],
+    },
+    entry_points={
+        # Registered by its module name, so that it is not loaded twice by pytest_plugins
+        "pytest11": ["paf.pytest_plugin = paf.pytest_plugin"],
+    },
     python_requires=">=3.13",
     license_files=("LICENSE.txt", )
 )
@@ -1,13 +1,20 @@
 import os
+from urllib.parse import quote
+from contextlib import contextmanager
+from typing import ContextManager
 
 import inject
 import pytest
 from selenium.webdriver import ChromeOptions
+from selenium.webdriver.remote.webdriver import WebDriver
 
 from paf.common import Size
+from paf.control import change
 from paf.manager import WebDriverManager
 from paf.page import PageFactory, FinderPage
 from paf.request import WebDriverRequest
+from benchmark.scenarios import create_document
+from benchmark.server import FakeWebDriverServer
 
 
 @pytest.fixture()
@@ -21,9 +28,57 @@ def finder():
     yield finder
 
 
+@pytest.fixture
+def fake_server():
+    with FakeWebDriverServer(create_document) as server:
+        yield server
+
+
+@pytest.fixture
+def fake_finder(fake_server: FakeWebDriverServer):
+    request = WebDriverRequest("fake")
+    request.browser = "chrome"
+    request.server_url = fake_server.url
+    manager = inject.instance(WebDriverManager)
+    webdriver = manager.get_webdriver(request)
+    # The fake server doesn't evaluate scripts
+    with change(script_resolution=False):
+        yield inject.instance(PageFactory).create_page(FinderPage, webdriver)
+    manager.shutdown(webdriver)
+
+
+@contextmanager
+def count_commands(webdriver: WebDriver) -> ContextManager[list[tuple[str, dict]]]:
+    """
+    Records the commands executed by the WebDriver, including the ones of its WebElements
+    """
+    commands = []
+    execute = webdriver.execute
+
+    def _execute(driver_command: str, params: dict = None):
+        commands.append((driver_command, params or {}))
+        return execute(driver_command, params)
+
+    webdriver.execute = _execute
+    try:
+        yield commands
+    finally:
+        webdriver.execute = execute
+
+
+def data_url(html: str) -> str:
+    """
+    Creates a URL of a page with the given HTML body
+    """
+    return "data:text/html;charset=utf-8," + quote(f"<!DOCTYPE html><html><body>{html}</body></html>")
+
+
 def get_webdriver(request: WebDriverRequest = None):
     manager = inject.instance(WebDriverManager)
+    return manager.get_webdriver(prepare_request(request))
+
 
+def prepare_request(request: WebDriverRequest = None) -> WebDriverRequest:
     if not request:
         request = WebDriverRequest("test")
 
@@ -50,4 +105,4 @@ def get_webdriver(request: WebDriverRequest = None):
         options.add_argument("--disable-gpu-sandbox")
 
     request.options = options
-    return manager.get_webdriver(request)
+    return request
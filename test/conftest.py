@@ -6,6 +6,8 @@ import logging
 import paf.config
 from paf.manager import WebDriverManager
 
+pytest_plugins = ("paf.pytest_plugin",)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def configure_inject():
@@ -20,5 +22,5 @@ def pytest_exception_interact(
     if inject.is_configured():
         manager = inject.instance(WebDriverManager)
         for webdriver in manager.webdrivers:
-            path = manager.take_screenshot(webdriver)
-            logging.error(f"Took screenshot: {path}")
+            future = manager.capture_screenshot(webdriver)
+            future.add_done_callback(lambda f: logging.error(f"Took screenshot: {f.result()}"))
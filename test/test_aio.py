@@ -0,0 +1,99 @@
+import asyncio
+
+import inject
+import pytest
+
+import paf.aio as aio
+from paf.aio import AsyncPage, AsyncUiElement
+from paf.common import Property
+from paf.control import change, get_config
+from paf.manager import WebDriverManager
+from paf.page import FinderPage
+from paf.request import WebDriverRequest
+from benchmark.server import FakeWebDriverServer
+from test import get_webdriver, finder, fake_server
+
+
+@pytest.mark.asyncio
+async def test_async_ui_element(finder: FinderPage):
+    page = AsyncPage(finder)
+    await page.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    await page.expect.title.be("Basic Web Page Example")
+
+    paragraph = page.find("#para1")
+    assert isinstance(paragraph, AsyncUiElement)
+    await paragraph.expect.text.be("A paragraph of text")
+    await paragraph.expect.text.contains("paragraph").be(True)
+    assert await paragraph.expect.text.actual == "A paragraph of text"
+    assert await paragraph.wait_for.displayed(True)
+
+    texts = [await item.expect.text.actual async for item in page.find(".centered").find("p")]
+    assert texts == ["A paragraph of text", "Another paragraph of text"]
+
+
+@pytest.mark.asyncio
+async def test_async_sessions():
+    async def run(i: int):
+        webdriver = await asyncio.to_thread(get_webdriver, WebDriverRequest(f"async{i}"))
+        page = AsyncPage(FinderPage(webdriver))
+        await page.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+        return await page.find("#para2").expect.text.actual
+
+    texts = await asyncio.gather(*[run(i) for i in range(3)])
+    assert texts == ["Another paragraph of text"] * 3
+
+
+def test_async_shared_executor(fake_server: FakeWebDriverServer):
+    manager = inject.instance(WebDriverManager)
+
+    def create_page(i: int) -> AsyncPage:
+        request = WebDriverRequest(f"async-fake{i}")
+        request.browser = "chrome"
+        request.server_url = fake_server.url
+        return AsyncPage(FinderPage(manager.get_webdriver(request)))
+
+    async def run(page: AsyncPage):
+        button = page.find("#button")
+        await button.expect.text.be("Submit")
+        assert await button.wait_for.text.be("Other") is False
+        return await button.expect.text.actual
+
+    async def run_all():
+        return await asyncio.gather(*[run(create_page(i)) for i in range(3)])
+
+    # The configuration is shared by all coroutines of the event loop's thread
+    with change(retry_count=2, wait_after_fail=0.01, script_resolution=False):
+        texts = asyncio.run(run_all())
+    assert texts == ["Submit"] * 3
+
+    executor = aio.get_executor()
+    assert executor._max_workers == int(Property.env(Property.PAF_ASYNC_MAX_WORKERS))
+
+    # Closing all sessions shuts down the workers
+    manager.shutdown_all()
+    assert executor._shutdown
+    assert aio.get_executor() is not executor
+
+
+def test_async_config_reaches_workers(fake_server: FakeWebDriverServer):
+    request = WebDriverRequest("async-config")
+    request.browser = "chrome"
+    request.server_url = fake_server.url
+    webdriver = inject.instance(WebDriverManager).get_webdriver(request)
+
+    def read_config():
+        config = get_config()
+        return config.fast_fill, config.element_cache, config.retry_count
+
+    async def run():
+        with change(fast_fill=True, element_cache=False, retry_count=7):
+            changed = await aio.run_in_session(webdriver, read_config)
+        return changed, await aio.run_in_session(webdriver, read_config)
+
+    changed, unchanged = asyncio.run(run())
+    assert changed == (True, False, 7)
+    assert unchanged == read_config()
+
+
+def teardown_module():
+    inject.instance(WebDriverManager).shutdown_all()
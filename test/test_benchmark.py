@@ -0,0 +1,32 @@
+from benchmark.runner import run, compare, Result
+from benchmark.scenarios import SCENARIOS
+
+
+def test_benchmark_scenarios():
+    results = {result.name: result for result in run(duration=0, min_iterations=1)}
+    assert len(results) == len(SCENARIOS)
+
+    for result in results.values():
+        assert result.iterations == 1
+        assert result.commands_per_op > 0
+
+    assert results["lookup_deep_chain"].commands_per_op < results["lookup_deep_chain_no_cache"].commands_per_op
+    assert results["lookup_deep_chain"].commands_per_op < results["lookup_deep_chain_cold"].commands_per_op
+
+
+def test_benchmark_compare():
+    results = [
+        Result("faster", 1, 200, 5, 2),
+        Result("slower", 1, 50, 20, 2),
+        Result("more_commands", 1, 100, 10, 3),
+        Result("new", 1, 1, 1000, 100),
+    ]
+    baseline = {
+        name: {"ops_per_second": 100, "commands_per_op": 2}
+        for name in ("faster", "slower", "more_commands")
+    }
+
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("slower:")
+    assert regressions[1].startswith("more_commands:")
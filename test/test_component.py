@@ -7,9 +7,9 @@ import pytest
 from paf.component import Component
 from paf.locator import By
 from paf.manager import WebDriverManager
-from paf.page import Page, PageFactory
+from paf.page import Page, PageFactory, FinderPage
 from paf.xpath import XPath
-from test import get_webdriver
+from test import get_webdriver, finder, data_url, count_commands
 
 
 @pytest.fixture
@@ -120,5 +120,17 @@ def test_cover_component_api(components_page: ComponentsPage):
     assert path.exists()
 
 
+def test_component_prefetch(finder: FinderPage):
+    finder.open(data_url('<form id="form"><input id="input"/><button id="button">Submit</button></form>'))
+    form = MyComponent(finder.find("#form"))
+    with form.prefetch(form.type, By.id("button")) as (input_element, button):
+        assert button.name_path == "MyComponent > UiElement(By.css selector(#form))[0] > UiElement(By.id(button))[0]"
+
+        with count_commands(finder.webdriver) as commands:
+            with input_element.find_web_element(), button.find_web_element():
+                pass
+        assert commands == []
+
+
 def teardown_module():
     inject.instance(WebDriverManager).shutdown_all()
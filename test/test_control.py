@@ -1,8 +1,12 @@
+import asyncio
 import dataclasses
+import pickle
 from time import sleep
 
-from paf.common import Property, ExecutionSpeed
-from paf.control import change, get_config, retry
+import pytest
+
+from paf.common import Property, ExecutionSpeed, Sequence, RetryException
+from paf.control import change, get_config, retry, async_retry
 from paf.page import FinderPage
 from test.test_uielement import test_form
 from test import finder
@@ -23,6 +27,98 @@ def test_change():
     assert global_config.wait_after_fail == backup_config.wait_after_fail
 
 
+def test_change_backoff():
+    with change(timeout=5, backoff_factor=2, max_wait=0.5, jitter=0.1):
+        config = get_config()
+        assert config.timeout == 5
+        assert config.backoff_factor == 2
+        assert config.max_wait == 0.5
+        assert config.jitter == 0.1
+
+    config = get_config()
+    assert config.timeout is None
+    assert config.backoff_factor == 1
+
+
+def test_backoff_waits():
+    sequence = Sequence(wait_after_fail=0.01, backoff_factor=2, max_wait=0.05)
+    waits = [sequence._get_wait() for i in range(5)]
+    assert waits == [0.01, 0.02, 0.04, 0.05, 0.05]
+
+
+def test_backoff_jitter():
+    sequence = Sequence(wait_after_fail=1, jitter=0.5)
+    for i in range(10):
+        assert 0.5 <= sequence._get_wait() <= 1.5
+
+
+def test_consume_retries():
+    sequence = Sequence(retry_count=4, wait_after_fail=0.01, backoff_factor=2, max_wait=0.05)
+    assert sequence.remaining == pytest.approx(0.12)
+
+    sequence.consume(0.035)
+    assert sequence.count == 2
+    assert sequence.remaining == pytest.approx(0.09)
+
+    sequence.consume(1)
+    assert sequence.count == 4
+    assert sequence.remaining == 0
+
+
+def test_deadline_retry():
+    attempts = 0
+
+    def _fail():
+        nonlocal attempts
+        attempts += 1
+        raise Exception("failed")
+
+    with change(timeout=0.3, wait_after_fail=0.005, backoff_factor=2, retry_count=0):
+        with pytest.raises(RetryException) as e:
+            retry(_fail)
+
+    assert attempts > 3
+    assert e.value._duration >= 0.3
+    assert e.value._duration < 0.5
+
+
+def test_deadline_retry_passes_fast():
+    attempts = 0
+
+    def _pass_late():
+        nonlocal attempts
+        attempts += 1
+        assert attempts > 2
+
+    with change(timeout=10, wait_after_fail=0.005, backoff_factor=2):
+        retry(_pass_late)
+
+    assert attempts == 3
+
+
+def test_async_retry():
+    attempts = 0
+    failures = []
+
+    async def _pass_late():
+        nonlocal attempts
+        attempts += 1
+        assert attempts > 2
+
+    with change(retry_count=3, wait_after_fail=0.001):
+        asyncio.run(async_retry(_pass_late, failures.append))
+
+    assert attempts == 3
+    assert len(failures) == 2
+
+    async def _fail():
+        raise Exception("Failed")
+
+    with pytest.raises(RetryException):
+        with change(retry_count=1, wait_after_fail=0.001):
+            asyncio.run(async_retry(_fail))
+
+
 def test_change_first():
     global_config = get_config()
     assert global_config.retry_count == Property.env(Property.PAF_SEQUENCE_RETRY_COUNT)
@@ -50,3 +146,15 @@ def test_execution_speed(finder: FinderPage):
 def test_execution_speed_random():
     execution_speed = ExecutionSpeed(min=1)
     assert execution_speed.get_random() == 1
+
+
+def test_properties_are_unique():
+    assert len(Property) == len(Property.__members__)
+    assert Property.PAF_SCRIPT_RESOLUTION is not Property.PAF_ELEMENT_CACHE
+    assert Property.PAF_SELENIUM_SERVER_URL is not Property.PAF_SEQUENCE_TIMEOUT
+    assert Property.PAF_SCRIPT_RESOLUTION.value == "1"
+    assert Property.PAF_DRIVER_PATH.value is None
+
+    assert Property("PAF_SCRIPT_RESOLUTION") is Property.PAF_SCRIPT_RESOLUTION
+    assert Property("chrome") is Property.PAF_BROWSER_SETTING
+    assert pickle.loads(pickle.dumps(Property.PAF_SCRIPT_RESOLUTION)) is Property.PAF_SCRIPT_RESOLUTION
@@ -0,0 +1,155 @@
+import pytest
+
+from paf.control import change
+from paf.locator import By
+from paf.page import FinderPage
+from test import finder, count_commands, data_url
+
+pytest.importorskip("lxml")
+pytest.importorskip("cssselect")
+
+from paf.dom_snapshot import DomSnapshot, NotEvaluableException, text, attribute, enabled
+
+
+def _step(by: str, value: str, index: int = 0, unique: bool = False, conditions: list[dict] = ()) -> dict:
+    return {"by": by, "value": value, "index": index, "unique": unique, "conditions": list(conditions)}
+
+
+def test_find_chain():
+    snapshot = DomSnapshot("""<html><body>
+<div id="list"><p class="item">First</p><p class="item" data-paf-hidden="">Hidden</p><p class="item">Third <b>bold</b></p></div>
+<div id="host"><paf-shadow-root><span class="inner">Shadow</span></paf-shadow-root></div>
+<input id="input" value="initial" data-paf-value="typed" data-paf-selected="" disabled="" data-paf-disabled=""/>
+<fieldset disabled=""><input id="fieldset-input" data-paf-value="" data-paf-disabled=""/></fieldset>
+<a id="link" href="/page" data-id="link" class="link">Link <span data-paf-styled-text="">upper</span></a>
+<iframe id="frame"></iframe>
+<div id="lines" data-paf-block=""><span data-paf-block="">block</span><div>inline</div> text<br/>break</div>
+</body></html>""")
+
+    items = snapshot.find_chain([_step("id", "list"), _step("css selector", ".item")])
+    assert [text(item) for item in items] == ["First", "", "Third bold"]
+
+    displayed = snapshot.find_chain([_step("id", "list"), _step("class name", "item", conditions=[{"type": "displayed"}])])
+    assert len(displayed) == 2
+
+    assert snapshot.find_chain([_step("css selector", "html")])[0] is snapshot.root
+    assert len(snapshot.find_chain([_step("xpath", "//p[@class='item']")])) == 3
+
+    # Lines are broken by the computed display, not by the tag
+    assert text(snapshot.find_chain([_step("id", "lines")])[0]) == "block\ninline text\nbreak"
+
+    # Shadow roots are only searchable from their host
+    assert snapshot.find_chain([_step("css selector", ".inner")]) == []
+    assert text(snapshot.find_chain([_step("id", "host"), _step("css selector", ".inner")])[0]) == "Shadow"
+
+    input_element = snapshot.find_chain([_step("id", "input")])[0]
+    assert attribute(input_element, "value") == "typed"
+    assert attribute(input_element, "checked") == "true"
+    assert attribute(input_element, "disabled") == "true"
+    assert attribute(input_element, "readonly") is None
+    assert enabled(input_element) is False
+
+    # Disabled by its fieldset, like WebElement.is_enabled()
+    fieldset_input = snapshot.find_chain([_step("id", "fieldset-input")])[0]
+    assert enabled(fieldset_input) is False
+    assert attribute(fieldset_input, "disabled") is None
+
+    # Properties differing from the attributes and styled texts are looked up live
+    link = snapshot.find_chain([_step("id", "link")])[0]
+    assert attribute(link, "class") == "link"
+    assert attribute(link, "data-id") == "link"
+    with pytest.raises(NotEvaluableException):
+        attribute(link, "href")
+    with pytest.raises(NotEvaluableException):
+        attribute(link, "value")
+    with pytest.raises(NotEvaluableException):
+        text(link)
+    assert snapshot.find_chain([_step("css selector", "a", conditions=[{"type": "text_contains", "value": "Link"}])]) is None
+
+    # Empty results within elements, which may host closed shadow roots, are looked up live
+    assert snapshot.find_chain([_step("id", "list"), _step("css selector", ".inexistent")]) is None
+    assert snapshot.find_chain([_step("id", "link"), _step("css selector", ".inexistent")]) == []
+    assert snapshot.find_chain([{**_step("id", "list"), "shadow": True}, _step("css selector", "p")]) is None
+
+    # Frames and layout conditions cannot be evaluated offline
+    assert snapshot.find_chain([_step("id", "frame"), _step("tag name", "p")]) is None
+    assert snapshot.find_chain([_step("css selector", "p", conditions=[{"type": "in_viewport"}])]) is None
+    assert snapshot.find_chain([_step("id", "list", unique=True), _step("css selector", "p")]) is not None
+    assert snapshot.find_chain([_step("css selector", "p", unique=True), _step("css selector", "b")]) is None
+
+
+def test_dom_snapshot_assertions(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-html-form-test.html")
+    username = finder.find(By.name("username"))
+    comments = finder.find(By.name("comments"))
+
+    with finder.dom_snapshot():
+        with count_commands(finder.webdriver) as commands:
+            username.expect.value.be("")
+            username.expect.tag_name.be("input")
+            username.expect.displayed(True)
+            username.expect.enabled(True)
+            comments.expect.value.be("Comments...")
+            comments.expect.count.be(1)
+        assert commands == []
+
+        username.type("Hello")
+        # Actions invalidate the snapshot
+        with count_commands(finder.webdriver) as commands:
+            username.expect.value.be("Hello")
+        assert len(commands) > 0
+
+    with finder.dom_snapshot():
+        with count_commands(finder.webdriver) as commands:
+            username.expect.value.be("Hello")
+        assert commands == []
+
+        # Properties which are not evaluable offline are looked up live
+        with count_commands(finder.webdriver) as commands:
+            username.expect.attribute("type").be("text")
+        assert len(commands) > 0
+
+        # Failures fall back to the live DOM
+        with count_commands(finder.webdriver) as commands:
+            with change(retry_count=1, wait_after_fail=0):
+                with pytest.raises(AssertionError):
+                    username.expect.value.be("Other")
+        assert len(commands) > 0
+
+    finder.open("https://practice.expandtesting.com/shadowdom")
+    with finder.dom_snapshot():
+        finder.find("#shadow-host").find("#my-btn").expect.text.be("This button is inside a Shadow DOM.")
+
+    # Frames are looked up live
+    finder.open("https://testpages.herokuapp.com/styled/frames/frames-test.html")
+    with finder.dom_snapshot():
+        finder.find(By.name("left")).find("li").expect.count.be(30)
+
+
+def test_dom_snapshot_text_by_display(finder: FinderPage):
+    finder.open(data_url(
+        '<div id="lines"><span style="display: block">block</span><div style="display: inline">inline</div> '
+        '<span style="display: flex">flex</span></div>'
+    ))
+    lines = finder.find("#lines")
+    lines.expect.text.be("block\ninline\nflex")
+
+    with finder.dom_snapshot():
+        with count_commands(finder.webdriver) as commands:
+            lines.expect.text.be("block\ninline\nflex")
+        assert commands == []
+
+
+def test_dom_snapshot_browser(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p = finder.find(By.id("para1"))
+    live_text = p.expect.text.actual
+
+    with finder.dom_snapshot():
+        assert p.expect.text.actual == live_text
+        finder.find("p").expect.count.be(2)
+
+    # Transformed texts are looked up live
+    finder.webdriver.execute_script("document.getElementById('para1').style.textTransform = 'uppercase'")
+    with finder.dom_snapshot():
+        p.expect.text.be(live_text.upper())
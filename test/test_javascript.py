@@ -31,5 +31,26 @@ def test_set_attribute(finder: FinderPage):
     p.expect.attribute("data-katze").be("affe")
 
 
+def test_bounds(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p = finder.find("#para1")
+    with p.find_web_element() as web_element:
+        bounds, viewport = javascript.get_bounds(p.webdriver, web_element)
+
+    assert bounds.width > 0
+    assert viewport.contains(bounds)
+
+
+def test_snapshot_enabled_like_webdriver(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    finder.webdriver.execute_script("""document.body.insertAdjacentHTML("beforeend",
+    '<fieldset disabled><legend><input id="legend-input"></legend><input id="fieldset-input"></fieldset>');""")
+
+    for selector in ("#legend-input", "#fieldset-input"):
+        with finder.find(selector).find_web_element() as web_element:
+            snapshot = javascript.get_snapshot(finder.webdriver, web_element)
+            assert snapshot.enabled == web_element.is_enabled()
+
+
 def teardown_module():
     inject.instance(WebDriverManager).shutdown_all()
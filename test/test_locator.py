@@ -1,5 +1,6 @@
 import pytest
 
+from paf.dom import Attribute
 from paf.locator import By
 from paf.xpath import XPath
 
@@ -94,3 +95,52 @@ def test_By_xpath_XPath():
 
 def test_XPath_group():
     assert str(XPath.at("(frame|iframe)")) == "(frame|iframe)"
+
+
+def test_XPath_immutable_once_built():
+    xpath = XPath.at("body")
+    assert str(xpath) == "//body"
+
+    sub = xpath.select("div")
+    assert str(xpath) == "//body"
+    assert str(sub) == "//body//div"
+
+    enclosed = sub.encloses("span").text.be("Text")
+    assert str(sub) == "//body//div"
+    assert str(enclosed) == "//body//div[descendant::span[.//text()='Text']]"
+
+    keys = {xpath: "body"}
+    assert str(xpath.id("a")) == "//body[@id='a']"
+    assert keys[xpath] == "body"
+
+
+def test_XPath_equality():
+    assert XPath.at("body").select("div") == XPath.at("body").select("div")
+    assert XPath.at("body") != XPath.at("div")
+    assert len({XPath.at("body").id("a"), XPath.at("body").id("a")}) == 1
+
+
+def test_XPath_interned():
+    first = XPath.at("body").select("div")
+    second = XPath.at("body").select("div")
+    assert str(first) is str(second)
+    assert str(first.id("a")) is not str(second)
+
+
+def test_By_conditions():
+    by = By.tag_name("p").displayed
+    conditioned = by.text_contains("Text").attribute_equals(Attribute.ID, "id")
+    assert by.get_conditions() == ({"type": "displayed"},)
+    assert conditioned.get_conditions() == (
+        {"type": "displayed"},
+        {"type": "text_contains", "value": "Text"},
+        {"type": "attribute", "name": "id", "value": "id"},
+    )
+    assert conditioned.get_filter() is None
+
+
+def test_By_shadow():
+    by = By.css_selector("my-component")
+    assert by.has_shadow_root is False
+    assert by.shadow.has_shadow_root is True
+    assert by.shadow.unique.has_shadow_root is True
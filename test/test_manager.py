@@ -1,23 +1,29 @@
 import asyncio
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import ParseResult
 
 import inject
 import pytest
 from selenium.webdriver import ChromeOptions
+from selenium.webdriver.remote.remote_connection import RemoteConnection
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.abstract_event_listener import AbstractEventListener
 from selenium.webdriver.support.event_firing_webdriver import EventFiringWebDriver
 
 import paf.config
+import paf.transport
 from paf.common import Property, Size, Rect, Point
 from paf.listener import WebDriverManagerListener
 from paf.manager import WebDriverManager
 from paf.page import PageFactory, FinderPage
+from paf.pool import WebDriverPool
 from paf.request import WebDriverRequest
-from test import get_webdriver, finder, page_factory, test_uielement
+from paf.transport import RemoteTransport
+from benchmark.server import FakeWebDriverServer
+from test import get_webdriver, finder, page_factory, test_uielement, prepare_request, fake_server
 
 
 @pytest.fixture
@@ -121,6 +127,9 @@ def test_remote_webdriver(monkeypatch):
     webdriver = get_webdriver(request)
     assert webdriver.name == request.browser
 
+    manager = inject.instance(WebDriverManager)
+    assert webdriver.command_executor._conn is manager.transport.create_connection(request.server_url.geturl(), {})._conn
+
 
 def test_unknown_browser_fails(manager: WebDriverManager):
     with pytest.raises(Exception) as e:
@@ -156,6 +165,144 @@ def test_window_maximize():
     assert window_rect.size.height > 1
 
 
+def test_pool_profile():
+    request = WebDriverRequest("first")
+    request.browser = "chrome"
+    request.options = ChromeOptions()
+
+    another = WebDriverRequest("second")
+    another.browser = "chrome"
+    another.options = ChromeOptions()
+    assert WebDriverPool.get_profile(request) == WebDriverPool.get_profile(another)
+
+    another.options.add_argument("--headless")
+    assert WebDriverPool.get_profile(request) != WebDriverPool.get_profile(another)
+
+
+def test_remote_transport():
+    transport = RemoteTransport(max_connections=4, timeout=30)
+    capabilities = ChromeOptions().to_capabilities()
+    connection = transport.create_connection("http://127.0.0.1:4444", capabilities)
+    another = transport.create_connection("http://127.0.0.1:4444", capabilities)
+
+    assert connection.keep_alive
+    assert "executeCdpCommand" in connection._commands
+    assert connection._conn is another._conn
+    assert connection._conn.connection_pool_kw["maxsize"] == 4
+    transport.clear()
+
+
+def test_remote_transport_fallback(monkeypatch):
+    original = paf.transport.get_remote_connection
+
+    def get_remote_connection(*args, **kwargs):
+        # Simulates changed Selenium internals
+        connection = original(*args, **kwargs)
+        del connection._proxy_url
+        return connection
+
+    transport = RemoteTransport()
+    monkeypatch.setattr(paf.transport, "get_remote_connection", get_remote_connection)
+    connection = transport.create_connection("http://127.0.0.1:4444", ChromeOptions().to_capabilities())
+
+    assert isinstance(connection, RemoteConnection)
+    assert "executeCdpCommand" in connection._commands
+    assert len(transport._connection_managers) == 0
+
+
+def test_pool_reuses_session(monkeypatch, manager: WebDriverManager):
+    pool = WebDriverPool(max_size=1)
+    monkeypatch.setattr(manager, "_pool", pool)
+
+    request = WebDriverRequest("pooled")
+    request.pooled = True
+    webdriver = get_webdriver(request)
+    session_id = webdriver.session_id
+    webdriver.get("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    manager.shutdown(webdriver)
+    assert pool.size == 1
+
+    request = WebDriverRequest("pooled-again")
+    request.pooled = True
+    webdriver = get_webdriver(request)
+    assert webdriver.session_id == session_id
+    assert webdriver.current_url == "about:blank"
+    assert manager.get_request_name(webdriver) == request.name
+    assert pool.size == 0
+
+    manager.shutdown_session(request)
+    pool.shutdown()
+    assert pool.size == 0
+
+
+def test_pool_is_opt_in_and_capped(monkeypatch, manager: WebDriverManager, fake_server: FakeWebDriverServer):
+    pool = WebDriverPool(max_size=2)
+    monkeypatch.setattr(manager, "_pool", pool)
+    # The health check is a script, which the fake server doesn't evaluate
+    monkeypatch.setattr(pool, "_is_healthy", lambda webdriver: True)
+    request = WebDriverRequest("pooled")
+    request.browser = "chrome"
+    request.server_url = fake_server.url
+
+    manager.prestart(request, 3)
+    assert pool.size == 2
+    pooled_ids = set(fake_server.sessions)
+    assert len(pooled_ids) == 2
+
+    # Sessions are only leased by requests which opt in
+    webdriver = manager.get_webdriver(request)
+    assert webdriver.session_id not in pooled_ids
+    manager.shutdown(webdriver)
+    assert set(fake_server.sessions) == pooled_ids
+
+    request.pooled = True
+    webdriver = manager.get_webdriver(request)
+    assert webdriver.session_id in pooled_ids
+    assert pool.size == 1
+    manager.shutdown(webdriver)
+    assert pool.size == 2
+
+    pool.shutdown()
+    assert len(fake_server.sessions) == 0
+
+
+def test_get_webdrivers(manager: WebDriverManager):
+    requests = [prepare_request(WebDriverRequest(f"parallel{i}")) for i in range(2)]
+    futures = manager.get_webdrivers(requests)
+    assert len(futures) == 2
+
+    webdrivers = [future.result() for future in futures]
+    for request, webdriver in zip(requests, webdrivers):
+        assert manager.get_request_name(webdriver) == request.name
+        assert manager.has_webdriver(request)
+
+    assert webdrivers[0].session_id != webdrivers[1].session_id
+
+    for webdriver in webdrivers:
+        manager.shutdown(webdriver)
+
+
+def test_get_webdrivers_same_session(manager: WebDriverManager):
+    request = prepare_request(WebDriverRequest("single"))
+    futures = manager.get_webdrivers([request, request, request])
+    webdrivers = [future.result() for future in futures]
+    assert webdrivers[0] is webdrivers[1] is webdrivers[2]
+    manager.shutdown(webdrivers[0])
+    assert manager.has_webdriver(request) is False
+
+
+def test_thread_default_webdriver(manager: WebDriverManager):
+    def task():
+        webdriver = get_webdriver(WebDriverRequest("thread-default"))
+        return webdriver, manager.get_webdriver()
+
+    with ThreadPoolExecutor(1) as executor:
+        webdriver, default_webdriver = executor.submit(task).result()
+
+    assert default_webdriver is webdriver
+    manager.shutdown(webdriver)
+
+
 def first_task():
     return inject.instance(WebDriverManager)
 
@@ -0,0 +1,102 @@
+import inject
+
+from paf.locator import By
+from paf.metrics import Histogram, CommandMetrics, command_origin, get_command_origin
+from paf.page import FinderPage
+from paf.uielement import DefaultUiElement
+from test import finder
+
+
+def test_histogram():
+    histogram = Histogram()
+    for duration in (0.0005, 0.003, 0.003, 0.2):
+        histogram.add(duration, 10)
+
+    assert histogram.count == 4
+    assert histogram.payload_size == 40
+    assert histogram.min == 0.0005
+    assert histogram.max == 0.2
+    assert histogram.percentile(25) == 0.001
+    assert histogram.percentile(50) == 0.005
+    assert histogram.percentile(100) == 0.2
+
+    other = Histogram()
+    other.add(2)
+    histogram.merge(other)
+    assert histogram.count == 5
+    assert histogram.max == 2
+
+
+def test_command_origin():
+    metrics = CommandMetrics()
+    metrics.test = "test"
+    p = DefaultUiElement(By.id("para1"))
+
+    assert get_command_origin() == (None, None)
+    with command_origin(p, "click"):
+        metrics.record("session", "clickElement", 0.1, 20)
+        with command_origin(p, "assert"):
+            metrics.record("session", "getElementText", 0.2)
+        metrics.record("session", "clickElement", 0.3)
+    metrics.record("another", "getTitle", 0.4)
+    assert get_command_origin() == (None, None)
+
+    by_name_path = metrics.histograms("name_path")
+    assert by_name_path[p.name_path].count == 3
+    assert by_name_path[None].count == 1
+
+    by_action = metrics.histograms("action", "command")
+    assert by_action[("click", "clickElement")].count == 2
+    assert by_action[("click", "clickElement")].payload_size == 20
+    assert by_action[("assert", "getElementText")].count == 1
+
+    by_session = metrics.histograms("session")
+    assert by_session["session"].count == 3
+    assert metrics.histograms("test")["test"].count == 4
+    assert metrics.report("session", limit=1).startswith("session:")
+
+    metrics.clear()
+    assert len(metrics.histograms("test")) == 0
+
+
+def test_name_path_built_at_report_time():
+    metrics = CommandMetrics()
+
+    class Source:
+        namings = 0
+
+        @property
+        def name_path(self):
+            # Like a page assertion, which reads the page title for its name
+            Source.namings += 1
+            metrics.record("session", "getTitle", 0.1)
+            return "PageAssertion.title"
+
+    source = Source()
+    with command_origin(source, "assert"):
+        for _ in range(3):
+            metrics.record("session", "getTitle", 0.1)
+    assert Source.namings == 0
+
+    assert metrics.histograms("name_path")["PageAssertion.title"].count == 3
+    assert Source.namings == 1
+    # Commands executed for naming are not recorded
+    assert metrics.histograms("command")["getTitle"].count == 3
+
+
+def test_instrumented_webdriver(finder: FinderPage):
+    metrics = inject.instance(CommandMetrics)
+    metrics.webdriver_introduce(finder.webdriver)
+    # Introducing the same session again doesn't wrap twice
+    metrics.webdriver_introduce(finder.webdriver)
+
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p = finder.find(By.id("para1"))
+    p.click()
+    p.expect.text.be("A paragraph of text")
+
+    by_origin = metrics.histograms("name_path", "action")
+    assert by_origin[(p.name_path, "click")].count > 0
+    assert by_origin[(p.name_path, "assert")].count > 0
+    assert "test_instrumented_webdriver" in metrics.histograms("test")
+    assert metrics.histograms("command")["get"].payload_size > 0
@@ -8,9 +8,10 @@ from paf.common import Point, Size
 from paf.control import change
 from paf.manager import WebDriverManager
 from paf.page import PageFactory, Page, FinderPage
+from paf.readiness import DocumentReady, NetworkIdle, DomQuiet, AngularReady, ScriptPredicate, from_names
 from paf.request import WebDriverRequest
 from test import get_webdriver
-from test import finder, page_factory
+from test import finder, page_factory, count_commands
 
 
 def test_assertions(finder: FinderPage):
@@ -29,6 +30,37 @@ def test_assertions(finder: FinderPage):
             finder.expect.url.ends_with("index.html").be(False)
 
 
+def test_readiness_from_names():
+    assert from_names(None) == ()
+    strategies = from_names("document, Network,dom,angular")
+    assert [str(strategy) for strategy in strategies] == ["DocumentReady", "NetworkIdle", "DomQuiet", "AngularReady"]
+    assert str(ScriptPredicate("window.ready")) == "ScriptPredicate(window.ready)"
+
+    with pytest.raises(ValueError, match="Unknown readiness strategy: react"):
+        from_names("document,react")
+
+
+def test_readiness_on_open(finder: FinderPage):
+    with count_commands(finder.webdriver) as commands:
+        finder.open("about:blank")
+    assert len(commands) == 1
+
+    with change(readiness=[DocumentReady(), NetworkIdle()]):
+        with count_commands(finder.webdriver) as commands:
+            finder.open("about:blank")
+        # Navigation and a single script for all strategies
+        assert len(commands) == 2
+
+
+def test_readiness_browser(finder: FinderPage):
+    with change(readiness=[DocumentReady(), NetworkIdle(200), DomQuiet(100), AngularReady()]):
+        finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    finder.webdriver.execute_script("window.setTimeout(function() { window.ready = true; }, 200)")
+    assert finder.wait_until_ready(ScriptPredicate("window.ready === true")) is True
+    with change(readiness_timeout=0.2):
+        assert finder.wait_until_ready(ScriptPredicate("window.never === true")) is False
+
+
 def test_create_page_from_page(page_factory: PageFactory):
     webdriver = get_webdriver(WebDriverRequest())
     page = page_factory.create_page(Page)
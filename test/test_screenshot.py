@@ -0,0 +1,23 @@
+import base64
+from pathlib import Path
+
+from paf.screenshot import ScreenshotWriter
+
+
+def test_write_screenshots(tmp_path: Path):
+    writer = ScreenshotWriter(max_queue_size=1)
+    futures = [writer.write(tmp_path / f"{i}.png", base64.b64encode(b"png").decode()) for i in range(3)]
+    writer.flush()
+
+    for i, future in enumerate(futures):
+        assert future.done()
+        assert future.result() == tmp_path / f"{i}.png"
+        assert future.result().read_bytes() == b"png"
+
+
+def test_write_screenshot_fails(tmp_path: Path):
+    file = tmp_path / "file"
+    file.write_text("")
+    writer = ScreenshotWriter()
+    future = writer.write(file / "test.png", base64.b64encode(b"png").decode())
+    assert future.result() is None
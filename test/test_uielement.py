@@ -1,16 +1,25 @@
 import re
+import time
 
 import inject
 import pytest
+from selenium.webdriver.remote.command import Command
 from selenium.webdriver.support.color import Color
 
+from paf.assertion import unused_assertions, QuantityAssertion
+import paf.javascript as script
+from paf.cache import get_cache
+from paf.common import NotFoundException, NotUniqueException, RetryException
 from paf.control import change, retry
+from paf.dom import Attribute
+from paf.listener import ActionListener
 from paf.locator import By
 from paf.manager import WebDriverManager
 from paf.page import FinderPage
 from paf.uielement import InexistentUiElement, DefaultUiElement
 from paf.xpath import XPath
-from test import finder
+from benchmark.server import FakeWebDriverServer
+from test import finder, fake_server, fake_finder, count_commands, data_url
 
 
 def test_basics(finder: FinderPage):
@@ -76,6 +85,21 @@ def test_assertions(finder: FinderPage):
     length.not_be(30)
 
 
+def test_snapshot(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+
+    p = finder.find("#para1")
+    snapshot = p.expect.snapshot(attributes=[Attribute.CLASS, "id"], css=["display"])
+    snapshot.map(lambda s: (s.tag_name, s.text, s.displayed, s.enabled)).be(("p", "A paragraph of text", True, True))
+
+    actual = snapshot.actual
+    assert actual.attribute("class") == "main"
+    assert actual.attribute("id") == "para1"
+    assert actual.css("display") == "block"
+    assert actual.bounds.width > 0
+    assert actual.visible is True
+
+
 def test_text_assertion_fails(finder: FinderPage):
     with pytest.raises(AssertionError, match=re.escape("Expected UiElement(By.css selector(#para1))[0].attribute(data) *undefined* to be [null] after 3 retries")):
         finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
@@ -88,6 +112,23 @@ def test_untested_assertion_raises(finder: FinderPage):
     title = finder.expect.title
 
 
+def test_unused_assertions_registry():
+    unused_assertions.flush()
+    p = DefaultUiElement(By.id("para1"))
+    p.expect.text.contains("paragraph")
+    p.expect.count
+
+    one = QuantityAssertion(parent=p, actual_supplier=lambda: 1, name_supplier=lambda: ".one")
+    one.between(0, 2).be(True)
+
+    assert unused_assertions.flush() == [
+        "UiElement(By.id(para1))[0].text *undefined*",
+        "UiElement(By.id(para1))[0].text *undefined*contains [paragraph]",
+        "UiElement(By.id(para1))[0] count *undefined*",
+    ]
+    assert unused_assertions.flush() == []
+
+
 def test_wait(finder: FinderPage):
     finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
 
@@ -206,6 +247,20 @@ def test_retry(finder: FinderPage):
         retry(lambda: clicks.expect.count.be(3), lambda e: btn.click())
 
 
+def test_browser_polling(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/key-click-display-test.html")
+    btn = finder.find(By.id("button").unique)
+    events = finder.find("#events")
+
+    with change(browser_polling=True):
+        events.find("p").expect.count.be(0)
+        btn.click()
+        events.find("p").expect.count.not_be(0)
+        events.expect.text.contains("click").be(True)
+        btn.expect.displayed(True)
+        btn.expect.attribute("id").be("button")
+
+
 def test_actions(finder: FinderPage):
     finder.open("https://testpages.herokuapp.com/styled/events/javascript-events.html")
 
@@ -272,6 +327,15 @@ def test_locate_displayed(finder: FinderPage):
     ok.expect.count.be(1)
 
 
+def test_locate_by_conditions(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    body = finder.find("body")
+    body.find(By.tag_name("p").text_contains("Another")).expect.count.be(1)
+    body.find(By.tag_name("p").attribute_equals(Attribute.ID, "para1")).expect.text.be("A paragraph of text")
+    finder.find(By.tag_name("p").displayed.enabled.in_viewport).expect.count.be(2)
+    finder.find(By.tag_name("p").text_contains("Inexistent")).expect.count.be(0)
+
+
 def test_uninitialized_ui_element_fails(finder: FinderPage):
     with pytest.raises(Exception) as e:
         ui_element = DefaultUiElement(By.id("id"))
@@ -296,6 +360,253 @@ def test_fail_message(finder: FinderPage):
             p1.expect.text.map(str.lower).ends_with("Katze").be(True)
 
 
+def test_assertion_naming_without_commands(fake_server: FakeWebDriverServer, fake_finder: FinderPage):
+    text = fake_finder.find("#button").expect.text
+    count = fake_server.command_count
+    assert text.name_path == "UiElement(By.css selector(#button))[0].text *undefined*"
+    assert fake_server.command_count == count
+
+    text.be("Submit")
+    count = fake_server.command_count
+    assert text.name_path == "UiElement(By.css selector(#button))[0].text [Submit]"
+    assert fake_server.command_count == count
+
+    with pytest.raises(AssertionError, match=re.escape("Expected UiElement(By.css selector(#button))[0].text [Submit] mapped ends with [Katze] to be [True]")):
+        with change(retry_count=0):
+            fake_finder.find("#button").expect.text.map(str.lower).ends_with("Katze").be(True)
+
+
+def test_assertion_naming_after_disappearance(fake_server: FakeWebDriverServer, fake_finder: FinderPage):
+    text = fake_finder.find("#button").expect.text
+    text.be("Submit")
+
+    session = next(iter(fake_server.sessions.values()))
+    for node in session.document.descendants():
+        node.children = [child for child in node.children if child.attributes.get("id") != "button"]
+
+    with pytest.raises(AssertionError, match=re.escape("Not found UiElement(By.css selector(#button))[0].text *undefined* to be [Submit]")):
+        with change(retry_count=0):
+            text.be("Submit")
+
+
+def test_browser_polling_in_frame(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/frames/frames-test.html")
+    item = finder.find(By.name("left")).find("li")[0]
+
+    with item.find_web_element() as web_element:
+        finder.webdriver.execute_script("const item = arguments[0]; setTimeout(() => item.textContent = 'changed', 200);", web_element)
+
+    with change(browser_polling=True, timeout=2, wait_after_fail=0.05):
+        start = time.time()
+        # Frames cannot be waited for within the browser, so the Python polling starts right away
+        item.expect.text.be("changed")
+        assert time.time() - start < 1
+
+
+def test_browser_polling_consumes_retries(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p = finder.find("#para1")
+
+    with change(browser_polling=True, retry_count=4, wait_after_fail=0.1):
+        start = time.time()
+        with pytest.raises(AssertionError):
+            p.expect.text.be("Other")
+        # The browser waited instead of the retries
+        assert time.time() - start < 0.7
+
+
+def test_visible_by_bounds(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p = finder.find("#para1")
+
+    with count_commands(finder.webdriver) as commands:
+        p.expect.visible(True)
+        p.expect.fully_visible(True)
+
+    # Visibility is read by the bounds script instead of the Selenium atoms
+    scripts = [params["script"] for command, params in commands if "script" in params]
+    assert any("getBoundingClientRect" in source for source in scripts)
+    assert not any(script._load_atom("isDisplayed") in source for source in scripts)
+
+    finder.webdriver.execute_script("document.getElementById('para1').style.cssText = 'position: absolute; top: -1000px'")
+    p.expect.visible(False)
+
+
+PREFETCH_PAGE = data_url("""
+<section id="chain"><div class="level0"><span class="leaf">leaf</span></div></section>
+<ul id="list">""" + "".join(f'<li class="item">Item {i}</li>' for i in range(10)) + """</ul>
+<button id="button">Submit</button>
+<input id="input"/>
+<iframe id="frame" srcdoc="<div id='framed'><button class='action'>framed</button></div>"></iframe>
+""")
+
+
+def test_prefetch(caplog, finder: FinderPage):
+    finder.open(PREFETCH_PAGE)
+    chain = finder.find("#chain")
+    frame_action = finder.find("#frame").find("#framed").find(".action")
+    leaf = chain.find(".level0").find(".leaf")
+    with count_commands(finder.webdriver) as commands, finder.prefetch(
+        "#button",
+        By.id("input"),
+        finder.find("#list").find(".item")[3],
+        leaf,
+        By.class_name("inexistent"),
+        frame_action,
+        finder.find(By.tag_name("li").filter(lambda web_element: True)),
+    ) as (button, input_element, item, *_):
+        # Switching to the default content and a single script call
+        assert len(commands) <= 2
+
+        commands.clear()
+        with button.find_web_element(), input_element.find_web_element(), item.find_web_element(), leaf.find_web_element():
+            pass
+        assert commands == []
+
+        item.expect.text.be("Item 3")
+        frame_action.expect.text.be("framed")
+
+        # Actions release the prefetched elements
+        button.click()
+        commands.clear()
+        with leaf.find_web_element():
+            pass
+        assert commands
+
+    # The elements are released at the end of the scope
+    with finder.prefetch(leaf):
+        pass
+    with count_commands(finder.webdriver) as commands:
+        with leaf.find_web_element():
+            pass
+    assert commands
+
+    with change(element_cache=False):
+        with finder.prefetch(leaf) as prefetched:
+            assert prefetched == [leaf]
+            with count_commands(finder.webdriver) as commands:
+                with leaf.find_web_element():
+                    pass
+            assert commands
+    assert "Prefetching requires element_cache and script_resolution" in caplog.text
+
+
+def test_count_and_index_by_script(monkeypatch, finder: FinderPage):
+    finder.open(data_url(
+        '<ul id="list">'
+        + "".join(f'<li class="item"{" hidden" if i % 5 == 0 else ""}>Item {i}</li>' for i in range(50))
+        + '</ul><button id="button">Submit</button>'
+    ))
+    items = finder.find("#list").find(".item")
+    inexistent = finder.find(".inexistent")
+
+    def _transfer_all(*args):
+        raise AssertionError("All element references transferred")
+
+    # Counting and selecting single elements doesn't need the whole list
+    with monkeypatch.context() as patch:
+        patch.setattr(script, "find_elements_by_chain", _transfer_all)
+        patch.setattr(finder.webdriver, "find_elements", _transfer_all)
+
+        items.expect.count.be(50)
+        finder.find("li").expect.count.be(50)
+        items[7].expect.text.be("Item 7")
+        items.last.expect.text.be("Item 49")
+        finder.find(By.tag_name("li").displayed)[3].expect.text.be("Item 4")
+        finder.find(By.id("button").unique).expect.text.be("Submit")
+
+        with pytest.raises(NotUniqueException):
+            with finder.find(By.class_name("item").unique).find_web_element():
+                pass
+        with pytest.raises(NotFoundException):
+            with items[50].find_web_element():
+                pass
+
+        # Absent elements are trusted by a single script call
+        with count_commands(finder.webdriver) as commands:
+            inexistent.expect.count.be(0)
+            finder.find("#list").find(".inexistent").expect.count.be(0)
+        assert len(commands) == 2
+        with count_commands(finder.webdriver) as commands:
+            with pytest.raises(NotFoundException):
+                with finder.find("#list").find(".inexistent").find_web_element():
+                    pass
+        assert len(commands) == 1
+
+    # Hosts of closed shadow roots are resolved element wise
+    chain = finder.find(By.id("button").shadow).find("span")._script_chain
+    assert script.count_elements_by_chain(finder.webdriver, chain) == {"fallback": True, "shadow": True}
+
+
+def test_closed_shadow_root_by_script(finder: FinderPage):
+    finder.open(data_url(
+        '<div id="host"></div><ul id="list"></ul>'
+        '<script>document.getElementById("host").attachShadow({mode: "closed"}).innerHTML = \'<span class="inner">closed</span>\';</script>'
+    ))
+    inner = finder.find("#host").find(".inner")
+
+    # Empty results within elements, which may host closed shadow roots, are looked up element wise
+    assert script.count_elements_by_chain(finder.webdriver, inner._script_chain) == {"fallback": True, "shadow": True}
+    inner.expect.count.be(1)
+    inner.expect.text.be("closed")
+
+    assert script.count_elements_by_chain(finder.webdriver, finder.find("#list").find(".inner")._script_chain) == {"count": 0}
+
+
+def test_fast_fill(monkeypatch, finder: FinderPage):
+    finder.open(data_url(
+        '<form id="form"><input id="input" name="input"/><textarea id="textarea"></textarea>'
+        '<input id="number" type="number"/><button id="button">Submit</button></form>'
+    ))
+    input_element = finder.find("#input")
+    input_element.type("Hello")
+    with count_commands(finder.webdriver) as key_commands:
+        input_element.type("Hello World")
+
+    with change(fast_fill=True):
+        with count_commands(finder.webdriver) as commands:
+            input_element.type("Hello World")
+        assert len(commands) < len(key_commands)
+        input_element.expect.value.be("Hello World")
+
+    form = finder.find("#form")
+    textarea = form.find("#textarea")
+    with count_commands(finder.webdriver) as commands:
+        finder.fill({
+            input_element: "Fast",
+            textarea: "Filled",
+        })
+    assert len(commands) == 1
+    input_element.expect.value.be("Fast")
+    textarea.expect.value.be("Filled")
+
+    # Fields which cannot be filled by script are typed with the configured fast fill
+    with count_commands(finder.webdriver) as commands:
+        finder.fill({
+            "#input": "Again",
+            finder.find(By.id("textarea").filter(lambda web_element: True)): "Filtered",
+        })
+    assert any(command == Command.SEND_KEYS_TO_ELEMENT for command, params in commands)
+    input_element.expect.value.be("Again")
+    textarea.expect.value.be("Filtered")
+
+    failures = []
+    listener = inject.instance(ActionListener)
+    monkeypatch.setattr(type(listener), "action_failed_finally", lambda self, name, ui_element, e: failures.append((name, ui_element)))
+    with pytest.raises(RetryException) as exception:
+        with change(retry_count=0):
+            finder.fill({form.find("#number"): "Not a number"})
+    assert "UiElement(By.css selector(#form))[0] > UiElement(By.css selector(#number))[0]" in str(exception.value)
+    assert [(name, ui_element.name_path) for name, ui_element in failures] == [
+        ("fill", "UiElement(By.css selector(#form))[0] > UiElement(By.css selector(#number))[0]"),
+    ]
+
+    with pytest.raises(RetryException) as exception:
+        with change(retry_count=0):
+            finder.fill({"#inexistent": "Inexistent"})
+    assert "UiElement(By.css selector(#inexistent))[0]" in str(exception.value)
+
+
 def test_not_unique_fails(finder: FinderPage):
     finder.open("https://testpages.herokuapp.com/styled/key-click-display-test.html")
     btn = finder.find(By.id("button").unique)
@@ -360,6 +671,114 @@ def test_web_element_keeps_unchanged(finder: FinderPage):
     with p.find_web_element() as web_element:
         assert web_element.id == id_before
 
+def test_cached_parent_recovers_from_stale(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p2 = finder.find(".centered").find("#para2")
+    p2.expect.tag_name.be("p")
+
+    with p2._ui_element.find_web_element() as web_element:
+        assert get_cache(finder.webdriver).get_context(p2._ui_element._chain_key).web_element == web_element
+
+    finder.webdriver.refresh()
+    p2.expect.tag_name.be("p")
+
+
+def test_cached_parent_before_script(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p2 = finder.find(".centered").find("#para2")
+    p2.expect.tag_name.be("p")
+    assert get_cache(finder.webdriver).get_context(p2._ui_element._chain_key) is not None
+
+    with count_commands(finder.webdriver) as commands:
+        with p2.find_web_element() as web_element:
+            assert web_element.get_attribute("id") == "para2"
+
+    # The element is found within the cached parent instead of by the chain script
+    scripts = [params["script"] for command, params in commands if "script" in params]
+    assert not any("selectChain(arguments[0])" in source for source in scripts)
+
+
+def test_collect(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    paragraphs = finder.find(".centered").find("p")
+    items = paragraphs.collect(text=True, attributes=[Attribute.ID])
+    assert items == [
+        {"text": "A paragraph of text", "attributes": {"id": "para1"}},
+        {"text": "Another paragraph of text", "attributes": {"id": "para2"}},
+    ]
+    assert finder.find("#inexistent").collect(text=True) == []
+
+
+def test_iteration_pins_elements(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    paragraphs = finder.find(".centered").find("p")
+    session_cache = get_cache(finder.webdriver)
+    items = []
+    for item in paragraphs:
+        items.append(item)
+        assert session_cache.get_pinned_element(item._chain_key) is not None
+    # The elements are only pinned during the iteration
+    assert session_cache.get_pinned_element(items[1]._chain_key) is None
+
+    for item in paragraphs:
+        finder.webdriver.refresh()
+        item.expect.text.be("A paragraph of text")
+
+        item.click()
+        assert session_cache.get_pinned_element(items[1]._chain_key) is None
+        break
+
+
+def test_element_cache_disabled(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/basic-web-page-test.html")
+    p2 = finder.find(".centered").find("#para2")
+
+    with change(element_cache=False):
+        p2.expect.tag_name.be("p")
+        assert get_cache(finder.webdriver).get_context(p2._ui_element._chain_key) is None
+
+
+def test_script_resolution(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/find-by-playground-test.html")
+    p = finder.find("#div1").find("p")
+
+    with change(script_resolution=False, element_cache=False):
+        count = p.expect.count.actual
+
+    with change(element_cache=False):
+        p.expect.count.be(count)
+        p[1].expect.attribute("name").be("pName2")
+        assert get_cache(finder.webdriver).is_script_fallback(p._ui_element._chain_key) is False
+
+
+def test_script_resolution_frame_fallback(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/frames/frames-test.html")
+    left = finder.find(By.name("left"))
+
+    with change(element_cache=False):
+        left.find("li").expect.count.be(30)
+        assert get_cache(finder.webdriver).is_script_fallback(left._chain_key) is True
+
+
+def test_frame_context_tracking(finder: FinderPage):
+    finder.open("https://testpages.herokuapp.com/styled/frames/frames-test.html")
+    left = finder.find(By.name("left"))
+    left.find("li").expect.count.be(30)
+
+    session_cache = get_cache(finder.webdriver)
+    with left.find_web_element() as frame:
+        assert [element.id for element in session_cache.frame_path] == [frame.id]
+
+    left.find("li").first.expect.tag_name.be("li")
+
+    # Switching the frame by someone else doesn't affect the lookups
+    with left.find_web_element() as frame:
+        finder.webdriver.switch_to.frame(frame)
+    finder.find(By.name("left")).expect.count.be(1)
+    finder.find("li").expect.count.be(0)
+    left.find("li").expect.count.be(30)
+
+
 def test_shadow_root_access(finder: FinderPage):
     finder.open("https://practice.expandtesting.com/shadowdom")
     shadow_host = finder.find("#shadow-host")
@@ -367,5 +786,22 @@ def test_shadow_root_access(finder: FinderPage):
         my_btn = shadow_host.find("#my-btn")
         my_btn.expect.text.be("This button is inside a Shadow DOM.")
 
+
+def test_shadow_root_hint(finder: FinderPage):
+    finder.open("https://practice.expandtesting.com/shadowdom")
+    shadow_host = finder.find(By.css_selector("#shadow-host").shadow)
+    with change(script_resolution=False, element_cache=False):
+        shadow_host.find("#my-btn").expect.text.be("This button is inside a Shadow DOM.")
+
+
+def test_shadow_root_detection_cache(finder: FinderPage):
+    finder.open("https://practice.expandtesting.com/shadowdom")
+    shadow_host = finder.find("#shadow-host")
+    with change(script_resolution=False, element_cache=False):
+        shadow_host.find("#my-btn").expect.text.be("This button is inside a Shadow DOM.")
+
+    with shadow_host.find_web_element() as web_element:
+        assert get_cache(finder.webdriver).has_shadow_root(web_element.id) is True
+
 def teardown_module():
     inject.instance(WebDriverManager).shutdown_all()